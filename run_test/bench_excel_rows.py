@@ -0,0 +1,113 @@
+"""
+Benchmark of PRExcelWriter row writing speed, in rows per second.
+Compares the previous per-cell writer(write_per_cell, a copy of PRExcelWriter.write_pull_request before rows
+were written as tuples) with the current write_pull_requests, with and without closing(compressing) the workbook.
+Output of the writers is discarded.
+
+    python bench_excel_rows.py [number of rows]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import Any, Callable, List, Optional, Union
+
+# pull requests are built with the helper of tests, its conftest also puts src on sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests'))
+
+from conftest import make_pull_request  # noqa: E402
+from pr_info_gatherer.const_defines import Defines  # noqa: E402
+from pr_info_gatherer.output_formats.to_excel import PRExcelWriter  # noqa: E402
+
+
+def make_pull_requests(count: int):
+    base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return [make_pull_request(base + timedelta(hours=7 * i),
+                              daysToApprove=9 / 24 if i % 2 == 0 else None,
+                              daysToMerge=40 / 24 if i % 3 != 0 else None,
+                              number=i, title=f'Pull request number {i}', author=f'author{i % 17}')
+            for i in range(count)]
+
+
+def bench(prs, writeAll, repeats: int = 3):
+    """ Returns best (rows/s of writing cells, rows/s including workbook close) of repeats """
+    results = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as tempDir:
+            writer = PRExcelWriter(os.path.join(tempDir, 'bench.xlsx'))
+            writer.add_worksheet('bench')
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                writeAll(writer, prs)
+            written = time.perf_counter()
+            writer.close()
+            closed = time.perf_counter()
+        results.append((len(prs) / (written - start), len(prs) / (closed - start)))
+    return tuple(map(max, zip(*results)))
+
+
+####################################
+### Baseline - per-cell writer, as it was before pull_request_to_row
+####################################
+
+
+def write_per_cell(writer: PRExcelWriter, prs):
+    for pr in prs:
+        write_pull_request_per_cell(writer, pr)
+
+
+def write_pull_request_per_cell(writer: PRExcelWriter, pr) -> None:
+    # write_datetime without format uses default_date_format of the workbook, the same format the old writer added
+    ws = writer.worksheet
+    cl = PRExcelWriter.Columns
+    line = writer.line
+
+    print('writing author: ', end=f"{ws.write(line, cl.author.value, pr.author)}\n")
+    print('writing pr date: ', end=f"{ws.write_datetime(line, cl.created_at.value, pr.createdAt)}\n")
+    print('writing state: ', end=f"{ws.write_string(line, cl.state.value, ','.join(pr.state))}\n")
+
+    write_cells_cond(ws, pr.firstReview, line, [
+        [cl.first_approved_by, lambda r, c: ws.write_string(r, c, pr.firstReview.author)],
+        [cl.first_approved_review_created_at, lambda r, c: ws.write_datetime(r, c, pr.firstReview.createdAt)],
+        [cl.days_until_first_approved, lambda r, c: ws.write_number(r, c, pr.firstReview.sincePRCreated.days)]
+    ])
+    write_cells_cond(ws, pr.mergeInfo, line, [
+        [cl.merged_by, lambda r, c: ws.write_string(r, c, pr.mergeInfo.byWhom)],
+        [cl.merged_at, lambda r, c: ws.write_datetime(r, c, pr.mergeInfo.mergedAt)],
+        [cl.days_until_merged, lambda r, c: ws.write_number(r, c, pr.mergeInfo.sincePRCreated.days)]
+    ])
+    write_cells_cond(ws, pr.from_approve_to_merge, line, [
+        [cl.days_from_approve_to_merge, lambda r, c: ws.write_number(r, c, pr.from_approve_to_merge.days)]
+    ])
+
+    print('writing if pr is closed: ', end=f"{ws.write_boolean(line, cl.is_closed.value, pr.closed)}\n")
+    print('writing pr title: ', end=f"{ws.write_string(line, cl.title.value, pr.title)}\n")
+
+    writer.increment_line()
+
+
+def write_cells_cond(ws, cond: Optional[Any], row: int, args: List[List[Union[IntEnum, Callable[[int, int], int]]]]):
+    if cond is not None:
+        for t in args:
+            print(f'writing {t[0].name}: ', end=f'{t[1](row, t[0].value)}\n')
+    else:
+        for t in args:
+            print(f'writing NULL {t[0].name}: ', end=f'{ws.write_string(row, t[0].value, Defines.XLSX_EMPTY_CELL)}\n')
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    prs = make_pull_requests(count)
+
+    print('%-28s %10s | %10s' % ('rows/s:', 'cells', 'with close'))
+    print('%-28s %10.0f | %10.0f' % ('before, write_per_cell:', *bench(prs, write_per_cell)))
+    print('%-28s %10.0f | %10.0f' % ('after, write_pull_requests:', *bench(prs, PRExcelWriter.write_pull_requests)))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
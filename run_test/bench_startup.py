@@ -0,0 +1,61 @@
+"""
+Startup time benchmark of the lightweight entry path (argument validation error),
+measured with "python -X importtime". Exits with 1 if the import budget is exceeded or
+if any of the heavy dependencies got imported.
+
+    python bench_startup.py [number of runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+
+# budget of summed cumulative import time of modules imported by main.py, in microseconds
+IMPORT_BUDGET_US = 30000
+HEAVY_MODULES = frozenset(['requests', 'dateutil', 'xlsxwriter', 'http.server'])
+# modules imported by the interpreter itself before main.py runs
+INTERPRETER_STARTUP_MODULE = 'site'
+
+
+def measure_once():
+    process = subprocess.run([sys.executable, '-X', 'importtime', MAIN_PATH, '-invalid_switch'],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    totalUs = 0
+    imported = set()
+    startupDone = False
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported.add(name.strip())
+        # top level imports are printed without indentation
+        if name.startswith('  '):
+            continue
+        if not startupDone:
+            startupDone = name.strip() == INTERPRETER_STARTUP_MODULE
+            continue
+        totalUs += int(cumulative)
+
+    return totalUs, imported & HEAVY_MODULES
+
+
+def main() -> int:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [measure_once() for _ in range(runs)]
+    medianUs = statistics.median(us for us, _ in results)
+    heavyImported = set().union(*(heavy for _, heavy in results))
+
+    print(f'main.py import time (median of {runs}): {medianUs / 1000:.1f} ms, budget: {IMPORT_BUDGET_US / 1000:.1f} ms')
+    if heavyImported:
+        print(f'Heavy modules imported on the lightweight path: {sorted(heavyImported)}')
+        return 1
+    if medianUs > IMPORT_BUDGET_US:
+        print('Import time budget exceeded')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -1,5 +1,8 @@
 import traceback
-from pr_info_gatherer import output_formats, UserInputError
+import pr_info_gatherer
+from pr_info_gatherer import UserInputError
+from pr_info_gatherer.cli_parser import parse_cli_args
+from pr_info_gatherer.cli_args import ServeCLArg
 import sys
 
 
@@ -7,7 +10,12 @@ def main() -> int:
     # print("App started!")
 
     try:
-        output_formats.to_excel.generate_excel(tuple(sys.argv))
+        inputDict = parse_cli_args(tuple(sys.argv))
+        # server and output formats are imported only here, heavy dependencies are not loaded for invalid input
+        if inputDict[ServeCLArg.CLI_TEXT] is not None:
+            pr_info_gatherer.server.serve(inputDict)
+        else:
+            pr_info_gatherer.output_formats.to_excel.generate_excel_from_input(inputDict)
     except UserInputError as userError:
         print(f'Invalid input: {userError}!')
         return 1
@@ -18,4 +26,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     exit(main())
-
@@ -1,3 +1,11 @@
-import pr_info_gatherer.output_formats as output_formats
 from pr_info_gatherer.common import UserInputError
+import importlib
 
+# submodules that pull in requests, dateutil or xlsxwriter are imported on first attribute access
+_LAZY_SUBMODULES = frozenset(['output_formats', 'server'])
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
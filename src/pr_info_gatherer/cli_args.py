@@ -1,8 +1,9 @@
 from pr_info_gatherer.const_defines import Defines
-from pr_info_gatherer.common import enum_with_checks, warn_assert, UserInputError
+from pr_info_gatherer.common import enum_with_checks, warn_assert, parse_iso_date, UserInputError
 import abc
 import copy
 from typing import List, Tuple, Optional, Union
+from datetime import datetime, timezone
 from enum import IntEnum
 import os
 
@@ -38,9 +39,11 @@ class CommandLineArgParser(abc.ABC):
         i = iterIndex
         retVal: List[str] = []
 
-        while i < count and argv[i][0] != '-':
+        while i < count and not (isinstance(argv[i], str) and argv[i].startswith('-')):
             if not isinstance(argv[i], str):
                 raise UserInputError(f'Invalid argument type: {type(argv[i])}')
+            if len(argv[i]) == 0:
+                raise UserInputError(f'Empty argument was provided for switch \'{switchName}\'')
             retVal.append(argv[i])
             i += 1
 
@@ -224,3 +227,195 @@ class ApiEndpointCLArg(CommandLineArgParser):
 
     def apply_arg(self, targetKey: str, targetDict: dict):
         targetDict[targetKey] = self.endpoint
+
+
+class JobFileCLArg(CommandLineArgParser):
+    """ Command line switch parser that reads path to a json file describing multiple report jobs """
+
+    CLI_TEXT = f'-{(KEY_NAME := "jobs")}'
+    TYPE = 'jb_f'
+
+    def __init__(self):
+        super().__init__(JobFileCLArg.KEY_NAME, JobFileCLArg.CLI_TEXT,
+                         JobFileCLArg.TYPE)
+        self.path: Optional[str] = None
+
+    def read_args(self, iterIndex: int, argv: Tuple[str]) -> Tuple[int, Optional[Exception]]:
+        try:
+            self.validate_cmd_text(argv[iterIndex])
+            newIndex, (jobsPath,) = CommandLineArgParser._read_args_until_next_command(iterIndex + 1, argv, self.cli_text, 1)
+            if not os.path.isfile(jobsPath):
+                raise UserInputError(f'Job file does not exist: "{jobsPath}"')
+            self.path = jobsPath
+            return newIndex, None
+        except Exception as error:
+            return iterIndex, error
+
+    def apply_arg(self, targetKey: str, targetDict: dict):
+        targetDict[targetKey] = self.path
+
+
+class ServeCLArg(CommandLineArgParser):
+    """
+    Command line switch parser that reads port of the local report server and
+    optional interval(in seconds) of background refreshes of the fetched repositories
+    """
+
+    CLI_TEXT = f'-{(KEY_NAME := "serve")}'
+    TYPE = 'srv'
+
+    def __init__(self):
+        super().__init__(ServeCLArg.KEY_NAME, ServeCLArg.CLI_TEXT,
+                         ServeCLArg.TYPE)
+        self.port: Optional[int] = None
+        self.refreshInterval: int = Defines.SERVER_REFRESH_INTERVAL_S
+
+    def read_args(self, iterIndex: int, argv: Tuple[str]) -> Tuple[int, Optional[Exception]]:
+        try:
+            self.validate_cmd_text(argv[iterIndex])
+            newIndex, (portStr, *restArgs) = \
+                CommandLineArgParser._read_args_until_next_command(iterIndex + 1, argv, self.cli_text)
+            warn_assert(len(restArgs) <= 1, lambda: 'More than one refresh interval was provided, '
+                                                    f'n = {len(restArgs)}')
+
+            port = int(portStr)
+            if not 0 < port < 65536:
+                return iterIndex, UserInputError(f'Invalid server port value: {port}')
+            refreshInterval = int(restArgs[0]) if len(restArgs) > 0 else self.refreshInterval
+            if refreshInterval < 0:
+                return iterIndex, UserInputError(f'Invalid refresh interval value: {refreshInterval}')
+
+            self.port = port
+            self.refreshInterval = refreshInterval
+            return newIndex, None
+        except Exception as error:
+            return iterIndex, error
+
+    def apply_arg(self, targetKey: str, targetDict: dict):
+        targetDict[targetKey] = [self.port, self.refreshInterval]
+
+
+class ShardsCLArg(CommandLineArgParser):
+    """
+    Command line switch parser that enables sharded fetching: history of each repository since given date
+    is split into number of created-at date windows, which are fetched in parallel
+    """
+
+    CLI_TEXT = f'-{(KEY_NAME := "shards")}'
+    TYPE = 'shrd'
+
+    def __init__(self):
+        super().__init__(ShardsCLArg.KEY_NAME, ShardsCLArg.CLI_TEXT,
+                         ShardsCLArg.TYPE)
+        self.since: Optional[datetime] = None
+        self.windowCount: int = 0
+
+    def read_args(self, iterIndex: int, argv: Tuple[str]) -> Tuple[int, Optional[Exception]]:
+        try:
+            self.validate_cmd_text(argv[iterIndex])
+            newIndex, (sinceStr, windowCountStr) = \
+                CommandLineArgParser._read_args_until_next_command(iterIndex + 1, argv, self.cli_text, 2)
+
+            since, err = parse_iso_date(sinceStr)
+            if err is not None:
+                return iterIndex, UserInputError(f'Invalid shards since date: "{sinceStr}"')
+            windowCount = int(windowCountStr)
+            if windowCount <= 0:
+                return iterIndex, UserInputError(f'Invalid shards window count value: {windowCount}')
+
+            self.since = since if since.tzinfo is not None else since.replace(tzinfo=timezone.utc)
+            self.windowCount = windowCount
+            return newIndex, None
+        except Exception as error:
+            return iterIndex, error
+
+    def apply_arg(self, targetKey: str, targetDict: dict):
+        targetDict[targetKey] = (self.since, self.windowCount)
+
+
+@enum_with_checks
+class TrendOutput(IntEnum):
+    """
+    Enum for possible trend outputs:
+    * sheet - .xlsx file with trend table and chart
+    * csv - .csv file with trend table
+    """
+
+    sheet = 0
+    csv = 1
+
+
+@enum_with_checks
+class TrendBucket(IntEnum):
+    """
+    Enum for possible trend buckets, pull requests are grouped by createdAt:
+    * week - ISO week
+    * month - calendar month
+    """
+
+    week = 0
+    month = 1
+
+
+class TrendCLArg(CommandLineArgParser):
+    """ Command line switch parser that reads trend output, bucket, rolling window and optional filename """
+
+    CLI_TEXT = f'-{(KEY_NAME := "trend")}'
+    TYPE = 'trnd'
+
+    def __init__(self):
+        super().__init__(TrendCLArg.KEY_NAME, TrendCLArg.CLI_TEXT,
+                         TrendCLArg.TYPE)
+        self.args: List[Union[str, int, TrendOutput, TrendBucket]] = []
+
+    def read_args(self, iterIndex: int, argv: Tuple[str]) -> Tuple[int, Optional[Exception]]:
+        try:
+            self.validate_cmd_text(argv[iterIndex])
+            (newIndex, (outputStr, bucketStr, windowStr, *restArgs)) = \
+                CommandLineArgParser._read_args_until_next_command(iterIndex + 1, argv, self.cli_text)
+
+            if not TrendOutput.has_name(outputStr):
+                return iterIndex, UserInputError(f'Unknown trend output: {outputStr}')
+            if not TrendBucket.has_name(bucketStr):
+                return iterIndex, UserInputError(f'Unknown trend bucket: {bucketStr}')
+            rollingWindow = int(windowStr)
+            if rollingWindow <= 0:
+                return iterIndex, UserInputError(f'Invalid trend rolling window value: {rollingWindow}')
+            warn_assert(len(restArgs) <= 1, lambda: 'More than one trend filename string was provided, '
+                                                    f'n = {len(restArgs)}')
+
+            filename = restArgs[0] if len(restArgs) > 0 else Defines.DEFAULT_TREND_FILE_NAME
+            self.args = [TrendOutput[outputStr], TrendBucket[bucketStr], rollingWindow, filename]
+            return newIndex, None
+        except Exception as error:
+            return iterIndex, error
+
+    def apply_arg(self, targetKey: str, targetDict: dict):
+        targetDict[targetKey] = self.args
+
+
+class RowDumpCLArg(CommandLineArgParser):
+    """ Command line switch parser that reads whether pull request rows are written(on) or skipped(off) """
+
+    CLI_TEXT = f'-{(KEY_NAME := "row_dump")}'
+    TYPE = 'rw_d'
+    VALUES = {'on': True, 'off': False}
+
+    def __init__(self):
+        super().__init__(RowDumpCLArg.KEY_NAME, RowDumpCLArg.CLI_TEXT,
+                         RowDumpCLArg.TYPE)
+        self.enabled = True
+
+    def read_args(self, iterIndex: int, argv: Tuple[str]) -> Tuple[int, Optional[Exception]]:
+        try:
+            self.validate_cmd_text(argv[iterIndex])
+            newIndex, (valueStr,) = CommandLineArgParser._read_args_until_next_command(iterIndex + 1, argv, self.cli_text, 1)
+            if valueStr not in RowDumpCLArg.VALUES:
+                return iterIndex, UserInputError(f'Invalid row dump value: {valueStr}')
+            self.enabled = RowDumpCLArg.VALUES[valueStr]
+            return newIndex, None
+        except Exception as error:
+            return iterIndex, error
+
+    def apply_arg(self, targetKey: str, targetDict: dict):
+        targetDict[targetKey] = self.enabled
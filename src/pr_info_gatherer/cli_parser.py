@@ -1,22 +1,30 @@
 from pr_info_gatherer.cli_args import RepoCLArg, ApiTokenCLArg, NumberOfRequestsCLArg, FileModeCLArg, \
-    ApiEndpointCLArg, CommandLineArgParser, FileMode
+    ApiEndpointCLArg, JobFileCLArg, ServeCLArg, ShardsCLArg, \
+    TrendCLArg, RowDumpCLArg, CommandLineArgParser, FileMode, TrendOutput
 from pr_info_gatherer.const_defines import Defines
-from pr_info_gatherer.common import UserInputError
-from typing import Tuple
+from pr_info_gatherer.common import UserInputError, with_extension, repo_path_to_name
+from typing import Tuple, List
+import os
 
 
 class Defines_CLI:
     """
     Defines for command line parsers:
-        * SWITCHES - dictionary of all command line arguments parsers, key = parser's cmd_text
+        * SWITCHES - dictionary of all command line arguments parser classes, key = parser's cmd_text,
+                     a fresh parser instance is created for every parsed switch
     """
 
     SWITCHES = {
-        RepoCLArg.CLI_TEXT: RepoCLArg(),
-        ApiTokenCLArg.CLI_TEXT: ApiTokenCLArg(),
-        NumberOfRequestsCLArg.CLI_TEXT: NumberOfRequestsCLArg(),
-        FileModeCLArg.CLI_TEXT: FileModeCLArg(),
-        ApiEndpointCLArg.CLI_TEXT: ApiEndpointCLArg()
+        RepoCLArg.CLI_TEXT: RepoCLArg,
+        ApiTokenCLArg.CLI_TEXT: ApiTokenCLArg,
+        NumberOfRequestsCLArg.CLI_TEXT: NumberOfRequestsCLArg,
+        FileModeCLArg.CLI_TEXT: FileModeCLArg,
+        ApiEndpointCLArg.CLI_TEXT: ApiEndpointCLArg,
+        JobFileCLArg.CLI_TEXT: JobFileCLArg,
+        ServeCLArg.CLI_TEXT: ServeCLArg,
+        ShardsCLArg.CLI_TEXT: ShardsCLArg,
+        TrendCLArg.CLI_TEXT: TrendCLArg,
+        RowDumpCLArg.CLI_TEXT: RowDumpCLArg
     }
 
 
@@ -28,7 +36,12 @@ def parse_cli_args(argv: Tuple[str]):
         ApiTokenCLArg.CLI_TEXT: Defines.DEFAULT_TOKEN,
         NumberOfRequestsCLArg.CLI_TEXT: 10,
         FileModeCLArg.CLI_TEXT: [FileMode.single_sheets, Defines.DEFAULT_FILE_NAME],
-        ApiEndpointCLArg.CLI_TEXT: Defines.DEFAULT_API_ENDPOINT
+        ApiEndpointCLArg.CLI_TEXT: Defines.DEFAULT_API_ENDPOINT,
+        JobFileCLArg.CLI_TEXT: None,
+        ServeCLArg.CLI_TEXT: None,
+        ShardsCLArg.CLI_TEXT: None,
+        TrendCLArg.CLI_TEXT: None,
+        RowDumpCLArg.CLI_TEXT: True
     }
     iterIndex = 1
     argvCount = len(argv)
@@ -43,7 +56,7 @@ def parse_cli_args(argv: Tuple[str]):
         elif cliKey in usedSwitches:
             raise UserInputError(f'Duplicate switch: "{cliKey}"')
         else:
-            cliSwitch = Defines_CLI.SWITCHES[cliKey]
+            cliSwitch = Defines_CLI.SWITCHES[cliKey]()
             iterIndex, err = cliSwitch.read_args(iterIndex, argv)
             if err is not None:
                 raise err
@@ -52,4 +65,38 @@ def parse_cli_args(argv: Tuple[str]):
         iterIndex += 1
         usedSwitches.add(cliKey)
 
+    if JobFileCLArg.CLI_TEXT in usedSwitches and len(usedSwitches) > 1:
+        raise UserInputError(f'Switch "{JobFileCLArg.CLI_TEXT}" cannot be combined with other switches, '
+                             'put them into the job file instead')
+    if not inputDict[RowDumpCLArg.CLI_TEXT] and inputDict[TrendCLArg.CLI_TEXT] is None:
+        raise UserInputError(f'Switch "{RowDumpCLArg.CLI_TEXT} off" requires "{TrendCLArg.CLI_TEXT}", '
+                             'otherwise nothing would be written')
+    outputs = output_files(inputDict)
+    for output in outputs:
+        if outputs.count(output) > 1:
+            if inputDict[TrendCLArg.CLI_TEXT] is not None and output == outputs[-1]:
+                raise UserInputError(f'Trend would overwrite pull request rows in "{output}", '
+                                     f'give "{TrendCLArg.CLI_TEXT}" a different filename')
+            raise UserInputError(f'File "{output}" would be written more than once, remove duplicate repositories')
+
     return inputDict
+
+
+def output_files(inputDict: dict) -> List[str]:
+    """ Absolute paths of files that report of parsed arguments is going to write """
+    outputs: List[str] = []
+
+    if inputDict[RowDumpCLArg.CLI_TEXT]:
+        fileMode, *fileModeArgs = inputDict[FileModeCLArg.CLI_TEXT]
+        if fileMode == FileMode.split_auto:
+            outputs.extend(f'{repo_path_to_name(repoPath)}{Defines.XLSX_FILE_EXTENSION}'
+                           for repoPath in inputDict[RepoCLArg.CLI_TEXT])
+        else:
+            outputs.append(with_extension(fileModeArgs[0], Defines.XLSX_FILE_EXTENSION))
+
+    if inputDict[TrendCLArg.CLI_TEXT] is not None:
+        trendOutput, _, _, trendFilename = inputDict[TrendCLArg.CLI_TEXT]
+        extension = Defines.XLSX_FILE_EXTENSION if trendOutput == TrendOutput.sheet else Defines.CSV_FILE_EXTENSION
+        outputs.append(with_extension(trendFilename, extension))
+
+    return [os.path.abspath(output) for output in outputs]
@@ -1,10 +1,15 @@
 from pr_info_gatherer.const_defines import Defines
-from typing import Tuple, Optional, Type, Callable
+from typing import Tuple, Optional, Type, Callable, Union, List, Iterator, TYPE_CHECKING
 from datetime import datetime
 from enum import IntEnum
+from contextlib import contextmanager
+import threading
 import warnings
-import requests
-import dateutil.parser
+import time
+import os
+
+if TYPE_CHECKING:
+    import requests
 
 ####################################
 ### Utility types and functions
@@ -13,19 +18,70 @@ import dateutil.parser
 
 def parse_iso_date(iso8601date: str) -> Tuple[datetime, Optional[Exception]]:
     """ Wrapper for dateutils isoparse that returns possible error as a part of tuple """
+    import dateutil.parser
+
     try:
         return dateutil.parser.isoparse(iso8601date), None
     except Exception as err:
         return dateutil.parser.isoparse(Defines.DEFAULT_DATE_STR), err
 
 
-def run_query(query: str, variables: Optional[str], headers: dict, endpoint: str) -> dict:
-    """ Sends http request to github graphql api """
+class SessionPool:
+    """
+    Pool of http sessions that can be shared between threads: requests.Session is not thread safe,
+    so every query borrows an idle session(or creates a new one) and returns it afterwards
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__idle: List['requests.Session'] = []
+        self.__all: List['requests.Session'] = []
+
+    @contextmanager
+    def session(self) -> Iterator['requests.Session']:
+        with self.__lock:
+            session = self.__idle.pop() if self.__idle else None
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            with self.__lock:
+                self.__all.append(session)
+        try:
+            yield session
+        finally:
+            with self.__lock:
+                self.__idle.append(session)
+
+    def close(self) -> None:
+        with self.__lock:
+            sessions, self.__all, self.__idle = self.__all, [], []
+        for session in sessions:
+            session.close()
+
+
+def run_query(query: str, variables: Optional[str], headers: dict, endpoint: str,
+              session: Optional[Union['requests.Session', SessionPool]] = None) -> dict:
+    """ Sends http request to github graphql api, reusing connections of the given session(or pool) if there is one """
+    if isinstance(session, SessionPool):
+        with session.session() as pooledSession:
+            return run_query(query, variables, headers, endpoint, pooledSession)
+
+    import requests
+
     requestJson: dict = {'query': query}
     if variables is not None:
         requestJson['variables'] = variables
 
-    request = requests.post(endpoint, json=requestJson, headers=headers)
+    post = (session if session is not None else requests).post
+    for attempt in range(Defines.API_RATE_LIMIT_RETRIES + 1):
+        request = post(endpoint, json=requestJson, headers=headers)
+        waitS = rate_limit_wait(request, attempt)
+        if waitS is None or attempt == Defines.API_RATE_LIMIT_RETRIES or waitS > Defines.API_RATE_LIMIT_MAX_WAIT_S:
+            break
+        print(f'-- Rate limited by the api, retrying in [ {waitS:.0f} ] s --')
+        time.sleep(waitS)
+
     if request.status_code == 200:
         jsonResult = request.json()
         if 'errors' in jsonResult:
@@ -39,6 +95,29 @@ def run_query(query: str, variables: Optional[str], headers: dict, endpoint: str
                            f', reason: "{request.reason}", query was: "{query}"')
 
 
+def rate_limit_wait(response: 'requests.Response', attempt: int) -> Optional[float]:
+    """ Seconds to wait before retrying the query, or None if response was not rejected by a rate limit """
+    if response.status_code == 200:
+        try:
+            rateLimited = any(error.get('type') == 'RATE_LIMITED' for error in response.json().get('errors', []))
+        except ValueError:
+            rateLimited = False
+    else:
+        rateLimited = response.status_code == 429 or (response.status_code == 403 and (
+            'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'
+            or 'rate limit' in response.text.lower()))
+    if not rateLimited:
+        return None
+
+    retryAfter = response.headers.get('Retry-After', '')
+    if retryAfter.isdigit():
+        return float(retryAfter)
+    reset = response.headers.get('X-RateLimit-Reset', '')
+    if response.headers.get('X-RateLimit-Remaining') == '0' and reset.isdigit():
+        return max(float(reset) - time.time(), 0.0) + 1.0
+    return float(Defines.API_RATE_LIMIT_BACKOFF_S * 2 ** attempt)
+
+
 def enum_with_checks(targetEnum: Type[IntEnum]):
     """
     Decorator that adds to IntEnum class static methods:
@@ -58,6 +137,22 @@ def warn_assert(value: bool, lazyMessage: Callable[[], str]):
     if not value:
         warnings.warn(lazyMessage())
 
+def with_extension(filename: str, extension: str) -> str:
+    """ Appends extension to filename, unless filename already has it """
+    return filename if os.path.splitext(filename)[1] == extension else filename + extension
+
+
+def repo_path_to_name(repoPath: str) -> str:
+    """ Converts "owner/repo" into "owner--repo", trimmed to the xlsx sheet name limit """
+    return repoPath.replace("/", "--")[0:Defines.XLSX_SHEET_NAME_CHAR_LIMIT]
+
+
+def make_temp_path(filename: str) -> str:
+    """ Returns path of temporary file next to filename, that can later replace filename with os.replace """
+    directory, basename = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, f'.{basename}.{os.getpid()}.tmp')
+
+
 class UserInputError(Exception):
     pass
 
@@ -10,6 +10,9 @@ class Defines:
 
     DEFAULT_FILE_NAME = 'merged_approved_pull_requests'
 
+    DEFAULT_TREND_FILE_NAME = 'pull_request_trends'
+    CSV_FILE_EXTENSION = '.csv'
+
     XLSX_DATE_TIME_FORMAT = 'hh:mm dd/mm/yy'
     XLSX_TIME_ELAPSED_FORMAT = 'd'
     XLSX_EMPTY_CELL = 'N/A'
@@ -17,10 +20,29 @@ class Defines:
     XLSX_SMALL_COLUMN_WIDTH = 5
     XLSX_FILE_EXTENSION = '.xlsx'
     XLSX_SHEET_NAME_CHAR_LIMIT = 31
+    XLSX_FINGERPRINTS_FILE = '.pr_info_fingerprints.json'
+    XLSX_TREND_SHEET_NAME = 'Trend'
+    XLSX_TREND_DAYS_FORMAT = '0.00'
 
     PR_MERGED_STATE = 'MERGED'
     PR_APPROVED_STATE = 'APPROVED'
     PR_CLOSED_STATE = 'CLOSED'
 
+    SERVER_HOST = '127.0.0.1'
+    SERVER_REFRESH_INTERVAL_S = 300
+    SERVER_REPORT_PATH = '/report'
+
+    SEARCH_PAGE_SIZE = 100
+    SEARCH_RESULTS_LIMIT = 1000
+    SEARCH_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+    SEARCH_EARLIEST_DATE_STR = '2007-10-01T00:00:00Z'
+    SHARD_MAX_WORKERS = 8
+
+    # retries of queries rejected by github rate limits, waits for Retry-After | X-RateLimit-Reset,
+    # or for exponential backoff(secondary rate limits without Retry-After ask to wait at least a minute)
+    API_RATE_LIMIT_RETRIES = 3
+    API_RATE_LIMIT_BACKOFF_S = 60
+    API_RATE_LIMIT_MAX_WAIT_S = 300
+
     FILE_MODE_SINGLE = "single"
     FILE_MODE_SPLIT_AUTO = "split_auto"
@@ -0,0 +1,120 @@
+from pr_info_gatherer.cli_parser import parse_cli_args, output_files, Defines_CLI
+from pr_info_gatherer.cli_args import JobFileCLArg, ServeCLArg, RepoCLArg, ApiTokenCLArg, FileModeCLArg, TrendCLArg
+from pr_info_gatherer.common import UserInputError
+from typing import List, Tuple, Union, Dict
+import json
+import os
+
+####################################
+### Job file - multiple report jobs described by a single json file
+####################################
+
+JOB_FILE_JOBS_KEY = 'jobs'
+
+JobValue = Union[str, int, List[Union[str, int]]]
+
+# positions of output filenames in job values, e.g. "file_mode": ["single", <filename>]
+_JOB_FILENAME_INDICES = {
+    FileModeCLArg.KEY_NAME: 1,
+    TrendCLArg.KEY_NAME: 3
+}
+
+
+def _validate_job_value(key: str, value) -> str:
+    """ Validates single json value of a job, that is going to become command line argument """
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise UserInputError(f'Invalid value of job key "{key}": {json.dumps(value)}, expected string or integer')
+    value = str(value)
+    if len(value) == 0:
+        raise UserInputError(f'Empty value of job key "{key}"')
+    if value.startswith('-'):
+        raise UserInputError(f'Value of job key "{key}" cannot start with "-": "{value}"')
+    return value
+
+
+def job_to_argv(job: dict) -> Tuple[str]:
+    """
+    Transforms job dictionary into command line arguments,
+    keys of the job are names of command line switches without leading '-'
+    """
+
+    argv: List[str] = ['jobs']
+    for key, value in job.items():
+        cliKey = f'-{key}'
+        if cliKey not in Defines_CLI.SWITCHES or cliKey in (JobFileCLArg.CLI_TEXT, ServeCLArg.CLI_TEXT):
+            raise UserInputError(f'Unknown job key: "{key}"')
+
+        argv.append(cliKey)
+        values: List[JobValue] = value if isinstance(value, list) else [value]
+        if len(values) == 0:
+            raise UserInputError(f'Empty value of job key "{key}"')
+        argv.extend(_validate_job_value(key, v) for v in values)
+
+    return tuple(argv)
+
+
+def resolve_job_paths(job: dict, jobDir: str) -> dict:
+    """
+    Makes relative paths of the job(token file, filenames given in file_mode | trend) relative to the directory
+    of the job file, default filenames and split_auto files stay relative to the current directory
+    """
+    resolved = dict(job)
+
+    token = resolved.get(ApiTokenCLArg.KEY_NAME)
+    if isinstance(token, str) and not os.path.isabs(token) and os.path.exists(os.path.join(jobDir, token)):
+        resolved[ApiTokenCLArg.KEY_NAME] = os.path.join(jobDir, token)
+
+    for key, index in _JOB_FILENAME_INDICES.items():
+        values = resolved.get(key)
+        if isinstance(values, list) and len(values) > index and isinstance(values[index], str) and values[index]:
+            resolved[key] = values[0:index] + [os.path.join(jobDir, values[index])] + values[index + 1:]
+
+    return resolved
+
+
+def load_job_file(jobsPath: str) -> List[dict]:
+    """
+    Reads json job file and parses each of its jobs into the same dictionary that parse_cli_args returns.
+    Top level keys other than "jobs" are defaults shared by every job, given relative paths are relative to the job file.
+    Jobs cannot write into the same output file, e.g.:
+        {
+            "api_token": "./token_file",
+            "jobs": [
+                { "repos": ["owner/repo1", "owner/repo2"], "file_mode": ["split_auto"], "pr_n": 100 },
+                { "repos": ["owner/repo1"], "file_mode": ["single", "repo1_latest"], "pr_n": 10 }
+            ]
+        }
+    """
+
+    try:
+        with open(jobsPath, 'r', encoding='utf-8') as jobsFile:
+            jobsJson = json.load(jobsFile)
+    except json.JSONDecodeError as err:
+        raise UserInputError(f'Job file "{jobsPath}" is not a valid json: {err}')
+
+    if not isinstance(jobsJson, dict) or not isinstance(jobsJson.get(JOB_FILE_JOBS_KEY), list):
+        raise UserInputError(f'Job file "{jobsPath}" has no "{JOB_FILE_JOBS_KEY}" list')
+
+    jobDir = os.path.dirname(os.path.abspath(jobsPath))
+    defaults = {key: value for key, value in jobsJson.items() if key != JOB_FILE_JOBS_KEY}
+    inputDicts: List[dict] = []
+    outputOwners: Dict[str, int] = {}
+    for index, job in enumerate(jobsJson[JOB_FILE_JOBS_KEY]):
+        if not isinstance(job, dict):
+            raise UserInputError(f'Job #{index} in "{jobsPath}" is not an object')
+
+        try:
+            inputDict = parse_cli_args(job_to_argv(resolve_job_paths({**defaults, **job}, jobDir)))
+        except UserInputError as userError:
+            raise UserInputError(f'Job #{index} in "{jobsPath}": {userError}')
+        if len(inputDict[RepoCLArg.CLI_TEXT]) == 0:
+            raise UserInputError(f'Job #{index} in "{jobsPath}" has no repository paths')
+
+        for output in output_files(inputDict):
+            if output in outputOwners:
+                raise UserInputError(f'Jobs #{outputOwners[output]} and #{index} in "{jobsPath}" both write '
+                                     f'"{output}", give them different filenames')
+            outputOwners[output] = index
+        inputDicts.append(inputDict)
+
+    return inputDicts
@@ -1 +1,10 @@
-import pr_info_gatherer.output_formats.to_excel
+import importlib
+
+# output formats are imported on first attribute access, so only the used writer's dependencies get loaded
+_LAZY_SUBMODULES = frozenset(['to_excel', 'to_json', 'to_csv'])
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
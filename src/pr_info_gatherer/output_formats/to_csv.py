@@ -0,0 +1,13 @@
+from typing import List
+import csv
+from pr_info_gatherer.const_defines import Defines
+from pr_info_gatherer.common import with_extension
+from pr_info_gatherer.trends import TrendRow
+
+
+def write_trend_csv(filename: str, rows: List[TrendRow]) -> None:
+    """ Writes trend rows into .csv file, empty statistics are written as empty cells """
+    with open(with_extension(filename, Defines.CSV_FILE_EXTENSION), 'w', newline='', encoding='utf-8') as csvFile:
+        writer = csv.writer(csvFile)
+        writer.writerow(TrendRow.COLUMNS)
+        writer.writerows(row.values() for row in rows)
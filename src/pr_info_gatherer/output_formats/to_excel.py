@@ -1,34 +1,82 @@
-from typing import List, Tuple, Optional, Type, Callable, Any, Union
+from typing import List, Tuple, Optional, Type, Dict, TYPE_CHECKING
 from types import TracebackType
 import traceback
 from os import path
-import xlsxwriter
+from contextlib import nullcontext
+import hashlib
+import json
+import os
+import warnings
 from enum import IntEnum
 from pr_info_gatherer.const_defines import Defines
-from pr_info_gatherer.common import UserInputError
-from pr_info_gatherer.cli_args import RepoCLArg, ApiTokenCLArg, FileModeCLArg, FileMode
-from pr_info_gatherer.pull_request import PullRequest, PullRequestQueryJson, fetch_json
+from pr_info_gatherer.common import UserInputError, make_temp_path, with_extension, repo_path_to_name
+from pr_info_gatherer.cli_args import RepoCLArg, ApiTokenCLArg, FileModeCLArg, JobFileCLArg, FileMode, \
+    TrendCLArg, RowDumpCLArg, TrendOutput, TrendBucket
+from pr_info_gatherer.pull_request import PullRequest, PullRequestQueryJson, PullRequestFetcher
 from pr_info_gatherer.cli_parser import parse_cli_args
+from pr_info_gatherer.jobs import load_job_file
+from pr_info_gatherer.trends import TrendRow, compute_trend
+
+if TYPE_CHECKING:
+    import xlsxwriter
 
 
 def generate_excel(argv: Tuple[str]):
-    inputDict = parse_cli_args(argv)
+    generate_excel_from_input(parse_cli_args(argv))
+
+
+def generate_excel_from_input(inputDict: dict):
+    if inputDict[JobFileCLArg.CLI_TEXT] is None:
+        generate_excel_report(inputDict)
+        return
+
+    jobs: List[dict] = load_job_file(inputDict[JobFileCLArg.CLI_TEXT])
+    fetcher = PullRequestFetcher()
+    try:
+        for job in jobs:
+            for repoPath in job[RepoCLArg.CLI_TEXT]:
+                fetcher.reserve(repoPath, job)
+
+        for index, job in enumerate(jobs):
+            print(f'\n-- Running job [ {index + 1}/{len(jobs)} ] --')
+            generate_excel_report(job, fetcher)
+    finally:
+        fetcher.close()
+
+
+def generate_excel_report(inputDict: dict, fetcher: Optional[PullRequestFetcher] = None):
     if len(inputDict[RepoCLArg.CLI_TEXT]) == 0:
         raise UserInputError('No repository paths were provided')
 
     headers = {'Authorization': f'token {inputDict[ApiTokenCLArg.CLI_TEXT]}'}
+    if fetcher is None:
+        fetcher = PullRequestFetcher()
+
+    allPullRequests: List[PullRequest] = []
+    rowDump: bool = inputDict[RowDumpCLArg.CLI_TEXT]
 
-    with PRExcelManager(*inputDict[FileModeCLArg.CLI_TEXT]) as excelFile:
+    with PRExcelManager(*inputDict[FileModeCLArg.CLI_TEXT]) if rowDump else nullcontext() as excelFile:
         for repoPath in inputDict[RepoCLArg.CLI_TEXT]:
-            resultJson: PullRequestQueryJson  = fetch_json(repoPath, inputDict, headers)
+            resultJson: PullRequestQueryJson  = fetcher.fetch(repoPath, inputDict, headers)
             resultList: List[PullRequest]     = PullRequest.create_list_of_approved_or_merged(resultJson)
+            allPullRequests.extend(resultList)
+            if excelFile is None:
+                continue
 
             print(f'\n-- Writing pr\'s for repo: [ {repoPath} ]--', end='')
-            excelFile.add_new_repo(repoPath, len(resultList))
             print(f'\n-- Number of merged|approved pull requests: [ {len(resultList)} ]--')
-            for pr in resultList:
-                print(f'\n-- Writing new merged|approved pull request: [ {pr.title} ] --')
-                excelFile.add_new_pull_request(pr)
+            if not excelFile.add_repo_pull_requests(repoPath, resultList):
+                print(f'-- Pull requests of [ {repoPath} ] did not change, keeping existing file --')
+
+    if inputDict[TrendCLArg.CLI_TEXT] is not None:
+        trendOutput, trendBucket, rollingWindow, trendFilename = inputDict[TrendCLArg.CLI_TEXT]
+        trendRows = compute_trend(allPullRequests, trendBucket, rollingWindow)
+        print(f'\n-- Writing trend of [ {len(allPullRequests)} ] pull requests, [ {len(trendRows)} ] buckets --')
+        if trendOutput == TrendOutput.sheet:
+            write_trend_excel(trendFilename, trendRows, trendBucket, rollingWindow)
+        else:
+            from pr_info_gatherer.output_formats.to_csv import write_trend_csv
+            write_trend_csv(trendFilename, trendRows)
 
 
 ####################################
@@ -65,11 +113,21 @@ class PRExcelWriter:
     ])
 
     def __init__(self, filename: str):
-        self.__excelWb = xlsxwriter.Workbook(filename=filename)
+        import xlsxwriter
+
+        # workbook is written into a temporary file, that replaces filename on close
+        self.__filename = filename
+        self.__tempFilename = make_temp_path(filename)
+        # cells are written with write_row: datetimes get default_date_format,
+        # strings are never converted into formulas or urls(as write_string would do)
+        self.__excelWb = xlsxwriter.Workbook(filename=self.__tempFilename, options={
+            'default_date_format': Defines.XLSX_DATE_TIME_FORMAT,
+            'strings_to_formulas': False,
+            'strings_to_urls': False
+        })
         self.__excelWorkSheet: Optional[xlsxwriter.Workbook.worksheet_class] = None
         self.__line = 0
 
-        self.__date_format = self.__excelWb.add_format({'num_format': Defines.XLSX_DATE_TIME_FORMAT})
         self.__time_elapse_format = self.__excelWb.add_format({'num_format': Defines.XLSX_TIME_ELAPSED_FORMAT})
 
     @property
@@ -96,54 +154,61 @@ class PRExcelWriter:
         self.__line = 0
 
     def close(self):
-        return self.__excelWb.close()
+        try:
+            self.__excelWb.close()
+        except Exception:
+            if path.exists(self.__tempFilename):
+                os.remove(self.__tempFilename)
+            raise
+        os.replace(self.__tempFilename, self.__filename)
+
+    def abort(self):
+        """ Closes the workbook and discards its temporary file, existing file with filename is kept untouched """
+        try:
+            self.__excelWb.close()
+        finally:
+            if path.exists(self.__tempFilename):
+                os.remove(self.__tempFilename)
 
     def write_pull_request(self, pr: PullRequest) -> None:
+        self.write_pull_requests([pr])
+
+    def write_pull_requests(self, prs: List[PullRequest]) -> None:
+        self.write_rows(list(map(PRExcelWriter.pull_request_to_row, prs)))
+
+    def write_rows(self, rows: List[tuple]) -> None:
+        """ Writes precomputed pull request rows(see pull_request_to_row), each row with a single write_row call """
         ws = self.__excelWorkSheet
-        cl = PRExcelWriter.Columns
-
-        # write info about author, date and state
-        print('writing author: ',
-              end=f"{ws.write(self.__line, cl.author.value, pr.author)}\n")
-        print('writing pr date: ',
-              end=f"{ws.write_datetime(self.__line, cl.created_at.value, pr.createdAt, self.__date_format)}\n")
-        print('writing state: ',
-              end=f"{ws.write_string(self.__line, cl.state.value, ','.join(pr.state))}\n")
-
-        # write first review information
-        PRExcelWriter.write_cells_cond(ws, pr.firstReview, self.__line, [
-            [cl.first_approved_by, lambda r, c: ws.write_string(r, c, pr.firstReview.author)],
-            [cl.first_approved_review_created_at, lambda r, c: ws.write_datetime(r, c, pr.firstReview.createdAt, self.__date_format)],
-            [cl.days_until_first_approved, lambda r, c: ws.write_number(r, c, pr.firstReview.sincePRCreated.days)]
-        ])
-        # write info about merging
-        PRExcelWriter.write_cells_cond(ws, pr.mergeInfo, self.__line, [
-            [cl.merged_by, lambda r, c: ws.write_string(r, c, pr.mergeInfo.byWhom)],
-            [cl.merged_at, lambda r, c: ws.write_datetime(r, c, pr.mergeInfo.mergedAt, self.__date_format)],
-            [cl.days_until_merged, lambda r, c: ws.write_number(r, c, pr.mergeInfo.sincePRCreated.days)]
-        ])
-        # write days from being approved to merged
-        PRExcelWriter.write_cells_cond(ws, pr.from_approve_to_merge, self.__line, [
-            [cl.days_from_approve_to_merge, lambda r, c: ws.write_number(r, c, pr.from_approve_to_merge.days)]
-        ])
-
-        # write boolean=pr is closed and write pr title
-        print('writing if pr is closed: ',
-              end=f"{ ws.write_boolean(self.__line, cl.is_closed.value, pr.closed) }\n")
-        print('writing pr title: ',
-              end=f"{ ws.write_string(self.__line, cl.title.value, pr.title) }\n")
-
-        self.increment_line()
+        line = self.__line
+        for row in rows:
+            ws.write_row(line, 0, row)
+            line += 1
+        self.__line = line
 
     @staticmethod
-    def write_cells_cond(ws: xlsxwriter.Workbook.worksheet_class, cond: Optional[Any], row: int,
-                         args: List[List[Union[IntEnum, Callable[[int, int], int]]]]):
-        if cond is not None:
-            for t in args:
-                print(f'writing {t[0].name}: ', end=f'{t[1](row, t[0].value)}\n')
-        else:
-            for t in args:
-                print(f'writing NULL {t[0].name}: ', end=f'{ws.write_string(row, t[0].value, Defines.XLSX_EMPTY_CELL)}\n')
+    def pull_request_to_row(pr: PullRequest) -> tuple:
+        """
+        Converts PullRequest into tuple of cell values in the order of Columns, missing values are N/A strings,
+        datetimes are formatted by workbook's default date format
+        """
+        empty = Defines.XLSX_EMPTY_CELL
+        review = pr.firstReview
+        merge = pr.mergeInfo
+
+        return (
+            pr.author,
+            pr.createdAt,
+            ','.join(pr.state),
+            empty if review is None else review.sincePRCreated.days,
+            empty if merge is None else merge.sincePRCreated.days,
+            empty if pr.from_approve_to_merge is None else pr.from_approve_to_merge.days,
+            empty if review is None else review.createdAt,
+            empty if review is None else review.author,
+            empty if merge is None else merge.mergedAt,
+            empty if merge is None else merge.byWhom,
+            pr.closed,
+            pr.title
+        )
 
 
 class PRExcelManager:
@@ -159,15 +224,15 @@ class PRExcelManager:
         if self.filemode not in FileMode or self.filemode == FileMode.placeholder:
             raise RuntimeError(f'Invalid filemode value was given to PRExcelManager: {self.filemode}')
 
+        # content fingerprints of files written in split_auto mode, key = filename
+        self.fingerprints: Dict[str, str] = {}
+        self.__fingerprintsChanged = False
+
         if self.filemode == FileMode.split_auto:
             self.writer = None
+            self.fingerprints = PRExcelManager.load_fingerprints()
         else:
-            filename: str = args[1]
-            _, extension = path.splitext(filename)
-            if extension != PRExcelManager.FILE_EXTENSION:
-                filename += PRExcelManager.FILE_EXTENSION
-
-            self.writer = PRExcelWriter(filename)
+            self.writer = PRExcelWriter(with_extension(args[1], PRExcelManager.FILE_EXTENSION))
             if self.filemode == FileMode.single:
                 self.writer.add_worksheet(PRExcelManager.DEFAULT_WORKSHEET_NAME)
 
@@ -176,14 +241,45 @@ class PRExcelManager:
 
     def __exit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException],
                  exc_trace: Optional[TracebackType]) -> None:
-        self.close()
         if exc_val is not None:
+            self.abort()
             raise exc_val
+        self.close()
+        if self.__fingerprintsChanged:
+            PRExcelManager.save_fingerprints(self.fingerprints)
 
     def close(self):
         if self.writer is not None:
             self.writer.close()
 
+    def abort(self):
+        """ Discards the file that is being written, files of already closed writers are kept """
+        if self.writer is not None:
+            self.writer.abort()
+
+    def add_repo_pull_requests(self, repoPath: str, prs: List[PullRequest]) -> bool:
+        """
+        Adds new repo with its pull requests, returns False if nothing was written - in split_auto mode
+        file of the repo is rewritten only if fingerprint of its rows differs from the one of the last write
+        """
+        rows = [PRExcelWriter.pull_request_to_row(pr) for pr in prs]
+
+        if self.filemode == FileMode.split_auto:
+            filename = PRExcelManager.repo_path_to_filename(repoPath)
+            fingerprint = PRExcelManager.rows_fingerprint(rows)
+            if self.fingerprints.get(filename) == fingerprint and path.exists(filename):
+                return False
+            self.fingerprints[filename] = fingerprint
+            self.__fingerprintsChanged = True
+
+        self.add_new_repo(repoPath, len(rows))
+        self.writer.write_rows(rows)
+        if self.filemode == FileMode.split_auto:
+            # file of the repo is complete, it is kept even if one of the next repos fails
+            self.close()
+            self.writer = None
+        return True
+
     def add_new_repo(self, repo_path: str, nOfApprovedPrs: int) -> None:
         if self.filemode == FileMode.single:
             # FileMode.single
@@ -199,8 +295,7 @@ class PRExcelManager:
             self.writer.add_worksheet(PRExcelManager.repo_path_to_name(repo_path))
         else:
             # FileMode.split_auto
-            self.close()
-            self.writer = PRExcelWriter(f'{PRExcelManager.repo_path_to_name(repo_path)}{Defines.XLSX_FILE_EXTENSION}')
+            self.writer = PRExcelWriter(PRExcelManager.repo_path_to_filename(repo_path))
             self.writer.add_worksheet(PRExcelManager.DEFAULT_WORKSHEET_NAME)
 
         if nOfApprovedPrs > 0:
@@ -213,9 +308,91 @@ class PRExcelManager:
 
         self.writer.increment_line()
 
-    def add_new_pull_request(self, pr: PullRequest) -> None:
-        self.writer.write_pull_request(pr)
-
     @staticmethod
     def repo_path_to_name(repoPath: str) -> str:
-        return repoPath.replace("/", "--")[0:Defines.XLSX_SHEET_NAME_CHAR_LIMIT]
+        return repo_path_to_name(repoPath)
+
+    @staticmethod
+    def repo_path_to_filename(repoPath: str) -> str:
+        return f'{PRExcelManager.repo_path_to_name(repoPath)}{Defines.XLSX_FILE_EXTENSION}'
+
+    @staticmethod
+    def rows_fingerprint(rows: List[tuple]) -> str:
+        """ Hash of normalized pull request rows, together with column names of the current layout """
+        normalized = json.dumps([[col.name for col in PRExcelWriter.Columns], rows],
+                                default=lambda value: value.isoformat(), ensure_ascii=False)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def load_fingerprints() -> Dict[str, str]:
+        if not path.exists(Defines.XLSX_FINGERPRINTS_FILE):
+            return {}
+        try:
+            with open(Defines.XLSX_FINGERPRINTS_FILE, 'r', encoding='utf-8') as fingerprintsFile:
+                fingerprints = json.load(fingerprintsFile)
+        except (OSError, ValueError) as err:
+            warnings.warn(f'Could not read "{Defines.XLSX_FINGERPRINTS_FILE}", all files will be rewritten: {err}')
+            return {}
+        return fingerprints if isinstance(fingerprints, dict) else {}
+
+    @staticmethod
+    def save_fingerprints(fingerprints: Dict[str, str]) -> None:
+        tempFilename = make_temp_path(Defines.XLSX_FINGERPRINTS_FILE)
+        with open(tempFilename, 'w', encoding='utf-8') as fingerprintsFile:
+            json.dump(fingerprints, fingerprintsFile, indent=2, sort_keys=True)
+        os.replace(tempFilename, Defines.XLSX_FINGERPRINTS_FILE)
+
+
+####################################
+### Trend writer
+####################################
+
+
+def write_trend_excel(filename: str, rows: List[TrendRow], bucket: TrendBucket, rollingWindow: int) -> None:
+    """
+    Writes trend rows into .xlsx file, with line chart of rolling median days to approve | merge.
+    Workbook is written into a temporary file, that replaces filename only after it was fully written
+    """
+
+    filename = with_extension(filename, Defines.XLSX_FILE_EXTENSION)
+    tempFilename = make_temp_path(filename)
+    try:
+        _write_trend_workbook(tempFilename, rows, bucket, rollingWindow)
+    except Exception:
+        if path.exists(tempFilename):
+            os.remove(tempFilename)
+        raise
+    os.replace(tempFilename, filename)
+
+
+def _write_trend_workbook(filename: str, rows: List[TrendRow], bucket: TrendBucket, rollingWindow: int) -> None:
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(filename=filename)
+    try:
+        worksheet = workbook.add_worksheet(Defines.XLSX_TREND_SHEET_NAME)
+        daysFormat = workbook.add_format({'num_format': Defines.XLSX_TREND_DAYS_FORMAT})
+        worksheet.set_column(0, len(TrendRow.COLUMNS) - 1, Defines.XLSX_COLUMN_WIDTH)
+        worksheet.write_row(0, 0, TrendRow.COLUMNS)
+        daysColumn = TrendRow.COLUMNS.index('median_days_to_approve')
+        for rowIndex, row in enumerate(rows, start=1):
+            values = row.values()
+            worksheet.write_row(rowIndex, 0, values[0:daysColumn])
+            worksheet.write_row(rowIndex, daysColumn, values[daysColumn:], daysFormat)
+
+        if len(rows) > 0:
+            chart = workbook.add_chart({'type': 'line'})
+            for column in ('rolling_median_days_to_approve', 'rolling_median_days_to_merge'):
+                columnIndex = TrendRow.COLUMNS.index(column)
+                chart.add_series({
+                    'name': [Defines.XLSX_TREND_SHEET_NAME, 0, columnIndex],
+                    'categories': [Defines.XLSX_TREND_SHEET_NAME, 1, 0, len(rows), 0],
+                    'values': [Defines.XLSX_TREND_SHEET_NAME, 1, columnIndex, len(rows), columnIndex]
+                })
+            chart.set_title({'name': f'Rolling median ({rollingWindow} {bucket.name}s) of days since pr created'})
+            chart.set_x_axis({'name': bucket.name})
+            chart.set_y_axis({'name': 'days'})
+            chart.show_blanks_as('span')
+            worksheet.insert_chart(1, len(TrendRow.COLUMNS) + 1, chart)
+    finally:
+        workbook.close()
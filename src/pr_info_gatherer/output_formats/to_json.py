@@ -0,0 +1,37 @@
+from typing import List, Optional
+from datetime import datetime, timedelta
+from pr_info_gatherer.pull_request import PullRequest
+
+####################################
+### Json conversion of PullRequest objects
+####################################
+
+
+def _date_to_json(date: Optional[datetime]) -> Optional[str]:
+    return None if date is None else date.isoformat()
+
+
+def _days_to_json(elapsed: Optional[timedelta]) -> Optional[int]:
+    return None if elapsed is None else elapsed.days
+
+
+def pull_request_to_json(pr: PullRequest) -> dict:
+    """ Converts PullRequest into json serializable dictionary, with the same fields as excel columns """
+    return {
+        'author': pr.author,
+        'created_at': _date_to_json(pr.createdAt),
+        'state': pr.state,
+        'days_until_first_approved': _days_to_json(pr.firstReview.sincePRCreated if pr.firstReview else None),
+        'days_until_merged': _days_to_json(pr.mergeInfo.sincePRCreated if pr.mergeInfo else None),
+        'days_from_approve_to_merge': _days_to_json(pr.from_approve_to_merge),
+        'first_approved_review_created_at': _date_to_json(pr.firstReview.createdAt if pr.firstReview else None),
+        'first_approved_by': pr.firstReview.author if pr.firstReview else None,
+        'merged_at': _date_to_json(pr.mergeInfo.mergedAt if pr.mergeInfo else None),
+        'merged_by': pr.mergeInfo.byWhom if pr.mergeInfo else None,
+        'is_closed': pr.closed,
+        'title': pr.title
+    }
+
+
+def pull_requests_to_json(prs: List[PullRequest]) -> List[dict]:
+    return [pull_request_to_json(pr) for pr in prs]
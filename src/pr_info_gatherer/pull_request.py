@@ -1,9 +1,19 @@
 from pr_info_gatherer.const_defines import Defines
-from pr_info_gatherer.common import parse_iso_date, run_query
-from pr_info_gatherer.cli_args import NumberOfRequestsCLArg, ApiEndpointCLArg
-from typing import List, TypedDict, Generic, TypeVar, Optional
-from datetime import datetime
+from pr_info_gatherer.common import parse_iso_date, run_query, SessionPool
+from pr_info_gatherer.cli_args import NumberOfRequestsCLArg, ApiEndpointCLArg, ApiTokenCLArg, ShardsCLArg
+from typing import List, TypedDict, Generic, TypeVar, Optional, Dict, Tuple, Iterable, Union, TYPE_CHECKING
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, Future
+import itertools
 import traceback
+import threading
+import hashlib
+import json
+
+if TYPE_CHECKING:
+    import requests
+
+SessionType = Optional[Union['requests.Session', SessionPool]]
 
 ####################################
 ### Json dictionary types
@@ -136,6 +146,34 @@ class PullRequest:
         return outputList
 
 
+_pull_request_fields_fragment = """
+fragment PullRequestFields on PullRequest {
+  number
+  createdAt
+  title
+  author {
+    login
+  }
+  closed
+  closedAt
+  mergedBy {
+    login
+  }
+  mergedAt
+  state
+  approvedReviews: reviews(last: 1, states: [APPROVED]) {
+    totalCount
+    edges {
+      node {
+        author {
+          login
+        }
+        createdAt
+      }
+    }
+  }
+}"""
+
 _fetch_json_query = """
 query(
     $repoOwner: String!, 
@@ -148,38 +186,39 @@ query(
         totalCount
         edges {
           node {
-            createdAt
-            title
-            author {
-              login
-            }
-            closed
-            closedAt
-            mergedBy {
-              login
-            }
-            mergedAt
-            state
-            approvedReviews: reviews(last: 1, states: [APPROVED]) {
-              totalCount
-              edges {
-                node {
-                  author {
-                    login
-                  }
-                  createdAt
-                }
-              }
-            }
+            ...PullRequestFields
           }
         }
       }
     }
   }
-}"""
+}""" + _pull_request_fields_fragment
+
+_fetch_search_json_query = """
+query(
+    $searchQuery: String!,
+    $pageSize: Int!,
+    $cursor: String
+    ) {
+  search(query: $searchQuery, type: ISSUE, first: $pageSize, after: $cursor) {
+    issueCount
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    edges {
+      node {
+        ...PullRequestFields
+      }
+    }
+  }
+}""" + _pull_request_fields_fragment
 
 
-def fetch_json(repoPath: str, inputDict: dict, headers: dict) -> PullRequestQueryJson:
+def fetch_json(repoPath: str, inputDict: dict, headers: dict, session: SessionType = None) -> PullRequestQueryJson:
+    if inputDict[ShardsCLArg.CLI_TEXT] is not None:
+        return fetch_json_sharded(repoPath, inputDict, headers, session)
+
     print(repoPath)
     repo_owner, repo_name = repoPath.split('/')
 
@@ -192,9 +231,283 @@ def fetch_json(repoPath: str, inputDict: dict, headers: dict) -> PullRequestQuer
     print(f'Variables for next query: {variables}')
     try:
         print('-- Sending api request... --')
-        result = run_query(_fetch_json_query, variables, headers, inputDict[ApiEndpointCLArg.CLI_TEXT])
+        result = run_query(_fetch_json_query, variables, headers, inputDict[ApiEndpointCLArg.CLI_TEXT], session)
         print('-- Success --')
         return result
     except Exception as err:
         print('-- http request function has thrown an error! --')
         raise err
+
+
+def split_date_windows(since: datetime, until: datetime, windowCount: int) -> List[Tuple[datetime, datetime]]:
+    """ Splits [since, until] into windowCount non overlapping windows, newest window first """
+    step = (until - since) / windowCount
+    starts = [since + step * i for i in range(windowCount)]
+    ends = [start - timedelta(seconds=1) for start in starts[1:]] + [until]
+    return list(reversed(list(zip(starts, ends))))
+
+
+def fetch_window_edges(repoPath: str, window: Tuple[datetime, datetime], inputDict: dict, headers: dict,
+                       session: SessionType, qualifiers: str = '') -> List[GraphQlNodeJson[PullRequestJson]]:
+    """
+    Fetches all pages of pull requests of repository, created within given window, via search query
+    (with optional additional search qualifiers).
+    Single search returns at most SEARCH_RESULTS_LIMIT results, so bigger windows are split in halves
+    """
+    since, until = window
+    start, end = (format_search_date(date) for date in window)
+    searchQuery = f'repo:{repoPath} is:pr created:{start}..{end}{qualifiers} sort:created-desc'
+    edges: List[GraphQlNodeJson[PullRequestJson]] = []
+    cursor: Optional[str] = None
+
+    while True:
+        variables = json.dumps({'searchQuery': searchQuery, 'pageSize': Defines.SEARCH_PAGE_SIZE, 'cursor': cursor})
+        result = run_query(_fetch_search_json_query, variables, headers, inputDict[ApiEndpointCLArg.CLI_TEXT], session)
+        searchJson = result['data']['search']
+
+        if cursor is None and searchJson['issueCount'] > Defines.SEARCH_RESULTS_LIMIT:
+            # search dates have precision of seconds, halves are [since, middle - 1s] and [middle, until]
+            middle = (since + (until - since) / 2).replace(microsecond=0)
+            if middle - timedelta(seconds=1) < since:
+                raise RuntimeError(f'Window "{searchQuery}" has {searchJson["issueCount"]} pull requests, '
+                                   f'more than {Defines.SEARCH_RESULTS_LIMIT} and it cannot be split further')
+            return fetch_window_edges(repoPath, (middle, until), inputDict, headers, session, qualifiers) + \
+                fetch_window_edges(repoPath, (since, middle - timedelta(seconds=1)), inputDict, headers, session,
+                                   qualifiers)
+
+        edges.extend(searchJson['edges'])
+        if not searchJson['pageInfo']['hasNextPage']:
+            return edges
+        cursor = searchJson['pageInfo']['endCursor']
+
+
+def fetch_created_edges(repoPath: str, since: datetime, until: datetime, windowCount: int, inputDict: dict,
+                        headers: dict, session: SessionType, qualifiers: str = '') \
+        -> List[GraphQlNodeJson[PullRequestJson]]:
+    """
+    Fetches pull requests of repository created within [since, until]: range is split into windowCount
+    created-at windows that are fetched in parallel, results are de-duplicated and sorted newest first
+    """
+    windows = split_date_windows(since, until, windowCount)
+    with ThreadPoolExecutor(max_workers=min(len(windows), Defines.SHARD_MAX_WORKERS)) as executor:
+        windowEdges = list(executor.map(
+            lambda window: fetch_window_edges(repoPath, window, inputDict, headers, session, qualifiers), windows))
+
+    return merge_edges([], (edge for windowList in windowEdges for edge in windowList))
+
+
+def merge_edges(edges: List[GraphQlNodeJson[PullRequestJson]], newEdges: Iterable[GraphQlNodeJson[PullRequestJson]]) \
+        -> List[GraphQlNodeJson[PullRequestJson]]:
+    """ Merges pull request edges by number(new edges replace old ones), result is sorted newest first """
+    byNumber: Dict[int, GraphQlNodeJson[PullRequestJson]] = {}
+    for edge in itertools.chain(edges, newEdges):
+        number = edge['node'].get('number')
+        if number is not None:
+            byNumber[number] = edge
+    return sorted(byNumber.values(), key=lambda e: e['node']['createdAt'], reverse=True)
+
+
+def edges_to_query_json(edges: List[GraphQlNodeJson[PullRequestJson]]) -> PullRequestQueryJson:
+    """ Wraps pull request edges into the same json as fetch_json returns """
+    return {'data': {'repositoryOwner': {'repository': {'pullRequests': {
+        'totalCount': len(edges),
+        'edges': edges
+    }}}}}
+
+
+def format_search_date(date: datetime) -> str:
+    return date.astimezone(timezone.utc).strftime(Defines.SEARCH_DATE_FORMAT)
+
+
+def fetch_json_sharded(repoPath: str, inputDict: dict, headers: dict,
+                       session: SessionType = None) -> PullRequestQueryJson:
+    """
+    Fetches every pull request of repository created since shards date: history is split into created-at windows
+    that are fetched in parallel, results are merged into the same json as fetch_json returns, newest first
+    """
+    since, windowCount = inputDict[ShardsCLArg.CLI_TEXT]
+    print(f'{repoPath}\n-- Sending api requests for [ {windowCount} ] date windows... --')
+    edges = fetch_created_edges(repoPath, since, datetime.now(timezone.utc), windowCount, inputDict, headers, session)
+    print(f'-- Success, fetched [ {len(edges)} ] pull requests --')
+
+    return edges_to_query_json(edges)
+
+
+####################################
+### PullRequestFetcher class
+####################################
+
+
+class PullRequestCache:
+    """
+    Cached pull requests of a single repository, newest first:
+        * completeSince - every pull request created at or after it is in edges
+        * fetchedAt     - pull requests updated after it may be outdated, refresh fetches them again
+    """
+
+    def __init__(self, edges: List[GraphQlNodeJson[PullRequestJson]], completeSince: datetime, fetchedAt: datetime,
+                 source: Tuple[str, dict, dict]):
+        self.edges = edges
+        self.completeSince = completeSince
+        self.fetchedAt = fetchedAt
+        self.source = source
+
+    def has_count(self, prCount: int) -> bool:
+        return len(self.edges) >= prCount or self.completeSince <= PullRequestFetcher.EARLIEST_DATE
+
+    def has_since(self, since: datetime) -> bool:
+        return self.completeSince <= since
+
+    def merged(self, other: 'PullRequestCache') -> 'PullRequestCache':
+        """ Both caches reach up to the time of their fetch, so their union is complete since the older start """
+        return PullRequestCache(merge_edges(self.edges, other.edges), min(self.completeSince, other.completeSince),
+                                min(self.fetchedAt, other.fetchedAt), other.source)
+
+
+CacheKey = Tuple[str, str, str]
+
+
+class PullRequestFetcher:
+    """
+    Class that fetches pull requests json of repositories through shared pool of http sessions.
+    Results are cached per (api endpoint, api token, repository) together with their coverage(see PullRequestCache),
+    so a repository used by several report jobs is fetched only once - with the biggest pr_n or the oldest
+    since date that was reserved for it.
+    Fetcher can be shared between threads: concurrent fetches of the same repository wait for a single request,
+    cached results are incrementally updated in the background with refresh().
+    """
+
+    EARLIEST_DATE = parse_iso_date(Defines.SEARCH_EARLIEST_DATE_STR)[0]
+
+    def __init__(self):
+        self.sessions = SessionPool()
+        self.__lock = threading.Lock()
+        self.__reservedCounts: Dict[CacheKey, int] = {}
+        self.__reservedSince: Dict[CacheKey, datetime] = {}
+        self.__cache: Dict[CacheKey, PullRequestCache] = {}
+        self.__inFlight: Dict[CacheKey, Future] = {}
+
+    @staticmethod
+    def cache_key(repoPath: str, inputDict: dict) -> CacheKey:
+        """ Results are never shared between tokens, token may not have access to the repository """
+        tokenHash = hashlib.sha256(inputDict[ApiTokenCLArg.CLI_TEXT].encode('utf-8')).hexdigest()
+        return inputDict[ApiEndpointCLArg.CLI_TEXT], tokenHash, repoPath
+
+    @staticmethod
+    def requested_since(inputDict: dict, since: Optional[datetime]) -> Optional[datetime]:
+        """ Sharded fetching ignores pr_n and requests every pull request created since shards date """
+        if since is None and inputDict[ShardsCLArg.CLI_TEXT] is not None:
+            return inputDict[ShardsCLArg.CLI_TEXT][0]
+        return since
+
+    def reserve(self, repoPath: str, inputDict: dict, since: Optional[datetime] = None) -> None:
+        """ Registers that repository will be requested with inputDict's pr_n(or since), before anything is fetched """
+        key = PullRequestFetcher.cache_key(repoPath, inputDict)
+        since = PullRequestFetcher.requested_since(inputDict, since)
+        with self.__lock:
+            if since is None:
+                self.__reservedCounts[key] = max(self.__reservedCounts.get(key, 0),
+                                                 inputDict[NumberOfRequestsCLArg.CLI_TEXT])
+            else:
+                self.__reservedSince[key] = min(self.__reservedSince.get(key, since), since)
+
+    def fetch(self, repoPath: str, inputDict: dict, headers: dict,
+              since: Optional[datetime] = None) -> PullRequestQueryJson:
+        """
+        Returns pull requests created since given date(or shards date), or pr_n newest ones if there is no date.
+        Only what is not cached yet is fetched
+        """
+        key = PullRequestFetcher.cache_key(repoPath, inputDict)
+        since = PullRequestFetcher.requested_since(inputDict, since)
+        prCount: int = inputDict[NumberOfRequestsCLArg.CLI_TEXT]
+
+        def is_covered(entry: Optional[PullRequestCache]) -> bool:
+            return entry is not None and (entry.has_count(prCount) if since is None else entry.has_since(since))
+
+        fetched = False
+        while True:
+            with self.__lock:
+                cached = self.__cache.get(key)
+                if is_covered(cached):
+                    break
+                pending = self.__inFlight.get(key)
+                isOwner = pending is None
+                if isOwner:
+                    pending = self.__inFlight[key] = Future()
+                    fetchCount = max(prCount, self.__reservedCounts.get(key, 0))
+                    fetchSince = since if since is None else min(since, self.__reservedSince.get(key, since))
+
+            if not isOwner:
+                # the same repository is being fetched by another thread, wait for it and check the cache again
+                pending.result()
+                continue
+
+            try:
+                self.__fetch_into_cache(key, repoPath, inputDict, headers, cached, fetchCount, fetchSince)
+                pending.set_result(None)
+                fetched = True
+            except BaseException as err:
+                pending.set_exception(err)
+                raise
+            finally:
+                with self.__lock:
+                    del self.__inFlight[key]
+
+        if not fetched:
+            print(f'{repoPath}\n-- Using already fetched pull requests --')
+        if since is None:
+            return edges_to_query_json(cached.edges[0:prCount])
+        sinceStr = format_search_date(since)
+        return edges_to_query_json([edge for edge in cached.edges if edge['node']['createdAt'] >= sinceStr])
+
+    def __fetch_into_cache(self, key: CacheKey, repoPath: str, inputDict: dict, headers: dict,
+                           cached: Optional[PullRequestCache], fetchCount: int, fetchSince: Optional[datetime]) -> None:
+        fetchDict = dict(inputDict)
+        fetchDict[NumberOfRequestsCLArg.CLI_TEXT] = fetchCount
+        fetchDict[ShardsCLArg.CLI_TEXT] = None
+        fetchedAt = datetime.now(timezone.utc)
+
+        if fetchSince is not None:
+            # fetch only created-at range that is not cached yet
+            until = fetchedAt if cached is None else cached.completeSince
+            windowCount = inputDict[ShardsCLArg.CLI_TEXT][1] if inputDict[ShardsCLArg.CLI_TEXT] is not None else 1
+            print(f'{repoPath}\n-- Sending api requests for pull requests created since [ {fetchSince} ]... --')
+            edges = fetch_created_edges(repoPath, fetchSince, until, windowCount, fetchDict, headers, self.sessions)
+            print(f'-- Success, fetched [ {len(edges)} ] pull requests --')
+            newEntry = PullRequestCache(edges, fetchSince, fetchedAt if cached is None else cached.fetchedAt,
+                                        (repoPath, fetchDict, headers))
+        else:
+            queryJson = fetch_json(repoPath, fetchDict, headers, self.sessions)
+            edges = queryJson['data']['repositoryOwner']['repository']['pullRequests']['edges']
+            completeSince = PullRequestFetcher.EARLIEST_DATE if len(edges) < fetchCount \
+                else parse_iso_date(edges[-1]['node']['createdAt'])[0]
+            newEntry = PullRequestCache(merge_edges([], edges), completeSince, fetchedAt, (repoPath, fetchDict, headers))
+
+        with self.__lock:
+            current = self.__cache.get(key)
+            self.__cache[key] = newEntry if current is None else current.merged(newEntry)
+
+    def refresh(self) -> None:
+        """ Fetches pull requests of cached repositories, that were created or updated since the last fetch """
+        with self.__lock:
+            entries = list(self.__cache.items())
+
+        for key, entry in entries:
+            repoPath, fetchDict, headers = entry.source
+            refreshedAt = datetime.now(timezone.utc)
+            try:
+                edges = fetch_created_edges(repoPath, max(entry.completeSince, PullRequestFetcher.EARLIEST_DATE),
+                                            refreshedAt, 1, fetchDict, headers, self.sessions,
+                                            f' updated:>={format_search_date(entry.fetchedAt)}')
+            except Exception as err:
+                print(f'-- Refresh of [ {repoPath} ] failed: {err} --')
+                continue
+
+            print(f'-- Refreshed [ {repoPath} ], [ {len(edges)} ] new or updated pull requests --')
+            with self.__lock:
+                current = self.__cache[key]
+                self.__cache[key] = PullRequestCache(merge_edges(current.edges, edges), current.completeSince,
+                                                     max(current.fetchedAt, refreshedAt), current.source)
+
+    def close(self) -> None:
+        self.sessions.close()
@@ -0,0 +1,127 @@
+from pr_info_gatherer.const_defines import Defines
+from pr_info_gatherer.common import UserInputError, parse_iso_date
+from pr_info_gatherer.cli_args import RepoCLArg, ApiTokenCLArg, NumberOfRequestsCLArg, ServeCLArg
+from pr_info_gatherer.pull_request import PullRequest, PullRequestFetcher
+from pr_info_gatherer.output_formats.to_json import pull_requests_to_json
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from datetime import datetime, timezone
+from typing import List, Optional
+import threading
+import json
+
+####################################
+### Report server - resident process that answers report requests from warm cache
+####################################
+
+
+class PRReportServer(ThreadingHTTPServer):
+    """
+    Local http server that answers GET /report?repos=owner/repo&since=<iso date>&pr_n=<int> requests
+    with json list of merged|approved pull requests per repository: every pull request created since given date,
+    or pr_n newest ones if there is no date.
+    Fetched repositories are kept in PullRequestFetcher cache and incrementally refreshed in the background.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, inputDict: dict):
+        port, self.refreshInterval = inputDict[ServeCLArg.CLI_TEXT]
+        super().__init__((Defines.SERVER_HOST, port), PRReportRequestHandler)
+
+        self.inputDict = inputDict
+        self.apiHeaders = {'Authorization': f'token {inputDict[ApiTokenCLArg.CLI_TEXT]}'}
+        self.fetcher = PullRequestFetcher()
+        self.__stopRefresh = threading.Event()
+        self.__refreshThread = threading.Thread(target=self.__refresh_loop, daemon=True)
+
+    def __refresh_loop(self) -> None:
+        while not self.__stopRefresh.wait(self.refreshInterval):
+            print('-- Refreshing fetched repositories --')
+            self.fetcher.refresh()
+
+    def report(self, repos: List[str], since: Optional[datetime], prCount: int) -> dict:
+        requestDict = dict(self.inputDict)
+        requestDict[NumberOfRequestsCLArg.CLI_TEXT] = prCount
+
+        result = {}
+        for repoPath in repos:
+            queryJson = self.fetcher.fetch(repoPath, requestDict, self.apiHeaders, since)
+            result[repoPath] = pull_requests_to_json(PullRequest.create_list_of_approved_or_merged(queryJson))
+
+        return result
+
+    def run(self) -> None:
+        for repoPath in self.inputDict[RepoCLArg.CLI_TEXT]:
+            self.fetcher.fetch(repoPath, self.inputDict, self.apiHeaders)
+
+        if self.refreshInterval > 0:
+            self.__refreshThread.start()
+
+        print(f'-- Serving reports on http://{Defines.SERVER_HOST}:{self.server_port}{Defines.SERVER_REPORT_PATH} --')
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.__stopRefresh.set()
+            self.server_close()
+            self.fetcher.close()
+
+
+class PRReportRequestHandler(BaseHTTPRequestHandler):
+    """ Request handler of PRReportServer """
+
+    server: PRReportServer
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != Defines.SERVER_REPORT_PATH:
+            self.send_json(404, {'error': f'Unknown path: "{url.path}"'})
+            return
+
+        try:
+            repos, since, prCount = PRReportRequestHandler.parse_report_query(
+                parse_qs(url.query), self.server.inputDict[NumberOfRequestsCLArg.CLI_TEXT])
+            self.send_json(200, self.server.report(repos, since, prCount))
+        except UserInputError as userError:
+            self.send_json(400, {'error': str(userError)})
+        except Exception as err:
+            self.send_json(502, {'error': str(err)})
+
+    def send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def parse_report_query(query: dict, defaultCount: int):
+        repos: List[str] = [repo for value in query.get('repos', []) for repo in value.split(',') if repo]
+        if len(repos) == 0:
+            raise UserInputError('No repository paths were provided')
+        if any(repo.count('/') != 1 for repo in repos):
+            raise UserInputError(f'Invalid repository paths: {repos}')
+
+        since: Optional[datetime] = None
+        if 'since' in query:
+            since, err = parse_iso_date(query['since'][0])
+            if err is not None:
+                raise UserInputError(f'Invalid since date: "{query["since"][0]}"')
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+
+        try:
+            prCount = int(query['pr_n'][0]) if 'pr_n' in query else defaultCount
+        except ValueError:
+            raise UserInputError(f'Invalid pull requests count value: "{query["pr_n"][0]}"')
+        if prCount <= 0:
+            raise UserInputError(f'Invalid pull requests count value: {prCount}')
+
+        return repos, since, prCount
+
+
+def serve(inputDict: dict) -> None:
+    PRReportServer(inputDict).run()
@@ -0,0 +1,102 @@
+from pr_info_gatherer.cli_args import TrendBucket
+from pr_info_gatherer.pull_request import PullRequest
+from typing import List, Optional, Dict
+from datetime import date, timedelta
+from collections import deque
+import statistics
+
+####################################
+### Trend of review and merge latency, bucketed by pull request creation date
+####################################
+
+_SECONDS_IN_DAY = 24 * 60 * 60
+
+
+class TrendRow:
+    """ Review and merge latency statistics of pull requests created within a single bucket """
+
+    COLUMNS = (
+        'bucket',
+        'pr_count',
+        'approved_count',
+        'merged_count',
+        'median_days_to_approve',
+        'median_days_to_merge',
+        'rolling_median_days_to_approve',
+        'rolling_median_days_to_merge'
+    )
+
+    def __init__(self, bucketStart: date, bucket: TrendBucket):
+        self.bucketStart = bucketStart
+        self.label = bucket_label(bucketStart, bucket)
+        self.prCount = 0
+        self.daysToApprove: List[float] = []
+        self.daysToMerge: List[float] = []
+        self.rollingMedianDaysToApprove: Optional[float] = None
+        self.rollingMedianDaysToMerge: Optional[float] = None
+
+    def values(self) -> tuple:
+        """ Row values in the order of COLUMNS """
+        return (self.label, self.prCount, len(self.daysToApprove), len(self.daysToMerge),
+                _median(self.daysToApprove), _median(self.daysToMerge),
+                self.rollingMedianDaysToApprove, self.rollingMedianDaysToMerge)
+
+
+def _median(samples: List[float]) -> Optional[float]:
+    return round(statistics.median(samples), 2) if samples else None
+
+
+def bucket_start(day: date, bucket: TrendBucket) -> date:
+    if bucket == TrendBucket.week:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket_start(start: date, bucket: TrendBucket) -> date:
+    if bucket == TrendBucket.week:
+        return start + timedelta(weeks=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def bucket_label(start: date, bucket: TrendBucket) -> str:
+    if bucket == TrendBucket.week:
+        isoYear, isoWeek, _ = start.isocalendar()
+        return f'{isoYear}-W{isoWeek:02d}'
+    return f'{start.year}-{start.month:02d}'
+
+
+def compute_trend(prs: List[PullRequest], bucket: TrendBucket, rollingWindow: int) -> List[TrendRow]:
+    """
+    Groups pull requests into continuous buckets(empty ones included) by createdAt and computes counts,
+    medians of days to first approve | merge and rolling medians over the last rollingWindow buckets
+    """
+
+    if len(prs) == 0:
+        return []
+
+    rowsByStart: Dict[date, TrendRow] = {}
+    for pr in prs:
+        start = bucket_start(pr.createdAt.date(), bucket)
+        row = rowsByStart.get(start)
+        if row is None:
+            row = rowsByStart[start] = TrendRow(start, bucket)
+
+        row.prCount += 1
+        if pr.firstReview is not None:
+            row.daysToApprove.append(pr.firstReview.sincePRCreated.total_seconds() / _SECONDS_IN_DAY)
+        if pr.mergeInfo is not None:
+            row.daysToMerge.append(pr.mergeInfo.sincePRCreated.total_seconds() / _SECONDS_IN_DAY)
+
+    rows: List[TrendRow] = []
+    start, lastStart = min(rowsByStart), max(rowsByStart)
+    while start <= lastStart:
+        rows.append(rowsByStart.get(start) or TrendRow(start, bucket))
+        start = next_bucket_start(start, bucket)
+
+    window: deque = deque(maxlen=rollingWindow)
+    for row in rows:
+        window.append(row)
+        row.rollingMedianDaysToApprove = _median([days for r in window for days in r.daysToApprove])
+        row.rollingMedianDaysToMerge = _median([days for r in window for days in r.daysToMerge])
+
+    return rows
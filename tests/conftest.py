@@ -0,0 +1,103 @@
+import copy
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from pr_info_gatherer.const_defines import Defines  # noqa: E402
+from pr_info_gatherer import pull_request  # noqa: E402
+from pr_info_gatherer.pull_request import PullRequest  # noqa: E402
+
+
+def format_date(date: datetime) -> str:
+    return date.strftime(Defines.SEARCH_DATE_FORMAT)
+
+
+def pull_request_json(createdAt: datetime, daysToApprove: Optional[float] = None, daysToMerge: Optional[float] = None,
+                      number: int = 1, title: str = 'title', author: str = 'author') -> dict:
+    """ Pull request node json, as returned by the api, approved | merged given number of days after creation """
+    approved = daysToApprove is not None
+    merged = daysToMerge is not None
+    return {
+        'number': number,
+        'author': {'login': author},
+        'createdAt': format_date(createdAt),
+        'title': title,
+        'closed': merged,
+        'state': 'MERGED' if merged else 'OPEN',
+        'mergedAt': format_date(createdAt + timedelta(days=daysToMerge)) if merged else None,
+        'mergedBy': {'login': 'merger'} if merged else None,
+        'approvedReviews': {
+            'totalCount': 1 if approved else 0,
+            'edges': [{'node': {'author': {'login': 'reviewer'},
+                                'createdAt': format_date(createdAt + timedelta(days=daysToApprove))}}]
+            if approved else []
+        }
+    }
+
+
+def make_pull_request(createdAt: datetime, daysToApprove: Optional[float] = None, daysToMerge: Optional[float] = None,
+                      **fields) -> PullRequest:
+    return PullRequest(pull_request_json(createdAt, daysToApprove, daysToMerge, **fields))
+
+
+class FakeGitHub:
+    """
+    Replacement of run_query, that answers pullRequests and search queries from in-memory pull requests.
+    Every query is recorded into requests, pull request nodes may have "updatedAt" for updated:>= qualifier
+    """
+
+    def __init__(self):
+        self.prs: Dict[str, List[dict]] = {}
+        self.requests: List[dict] = []
+        self.delay = 0.0
+        self.error: Optional[Exception] = None
+        self.__lock = threading.Lock()
+
+    def add_pull_requests(self, repoPath: str, createdDates: List[datetime]) -> List[dict]:
+        prs = self.prs.setdefault(repoPath, [])
+        added = [pull_request_json(createdAt, number=len(prs) + i) for i, createdAt in enumerate(createdDates)]
+        prs.extend(added)
+        return added
+
+    def __newest_first(self, repoPath: str) -> List[dict]:
+        return sorted(self.prs.get(repoPath, []), key=lambda node: node['createdAt'], reverse=True)
+
+    def run_query(self, query: str, variables: str, headers: dict, endpoint: str, session=None) -> dict:
+        variables = json.loads(variables)
+        with self.__lock:
+            self.requests.append({'token': headers['Authorization'], **variables})
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+        if 'searchQuery' not in variables:
+            repoPath = f'{variables["repoOwner"]}/{variables["repoName"]}'
+            edges = [{'node': copy.deepcopy(node)} for node in self.__newest_first(repoPath)[0:variables['pr_n']]]
+            return {'data': {'repositoryOwner': {'repository': {'pullRequests': {
+                'totalCount': len(self.prs.get(repoPath, [])), 'edges': edges}}}}}
+
+        searchQuery = variables['searchQuery']
+        repoPath = re.search(r'repo:(\S+)', searchQuery).group(1)
+        start, end = re.search(r'created:(\S+)\.\.(\S+)', searchQuery).groups()
+        updated = re.search(r'updated:>=(\S+)', searchQuery)
+        edges = [{'node': copy.deepcopy(node)} for node in self.__newest_first(repoPath)
+                 if start <= node['createdAt'] <= end
+                 and (updated is None or node.get('updatedAt', node['createdAt']) >= updated.group(1))]
+        return {'data': {'search': {
+            'issueCount': len(edges), 'edges': edges, 'pageInfo': {'hasNextPage': False, 'endCursor': None}}}}
+
+
+@pytest.fixture
+def fake_github(monkeypatch) -> FakeGitHub:
+    fake = FakeGitHub()
+    monkeypatch.setattr(pull_request, 'run_query', fake.run_query)
+    return fake
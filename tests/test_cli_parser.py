@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from pr_info_gatherer.cli_args import TrendCLArg, RowDumpCLArg
+from pr_info_gatherer.cli_parser import parse_cli_args, output_files
+from pr_info_gatherer.common import UserInputError
+
+
+def parse(*args: str) -> dict:
+    return parse_cli_args(('main', '-repos', 'owner/repo1', 'owner/repo2') + args)
+
+
+def test_output_files_of_row_dump_and_trend():
+    inputDict = parse('-file_mode', 'single', 'report', '-trend', 'csv', 'week', '4', 'report')
+
+    assert output_files(inputDict) == [os.path.abspath('report.xlsx'), os.path.abspath('report.csv')]
+
+
+def test_output_files_of_split_auto_without_row_dump():
+    assert output_files(parse('-file_mode', 'split_auto')) == \
+        [os.path.abspath('owner--repo1.xlsx'), os.path.abspath('owner--repo2.xlsx')]
+    assert output_files(parse('-row_dump', 'off', '-trend', 'sheet', 'month', '2', 'trend')) == \
+        [os.path.abspath('trend.xlsx')]
+
+
+def test_row_dump_off_requires_trend():
+    assert parse('-row_dump', 'off', '-trend', 'csv', 'week', '4')[RowDumpCLArg.CLI_TEXT] is False
+    with pytest.raises(UserInputError, match='requires "-trend"'):
+        parse('-row_dump', 'off')
+
+
+@pytest.mark.parametrize('args', [
+    ('-file_mode', 'single', 'same', '-trend', 'sheet', 'week', '2', 'same'),
+    ('-file_mode', 'single_sheets', 'same.xlsx', '-trend', 'sheet', 'week', '2', 'same'),
+    ('-file_mode', 'split_auto', '-trend', 'sheet', 'week', '2', 'owner--repo2')
+])
+def test_trend_cannot_overwrite_row_dump(args):
+    with pytest.raises(UserInputError, match=f'give "{TrendCLArg.CLI_TEXT}" a different filename'):
+        parse(*args)
+
+
+def test_split_auto_rejects_duplicate_repositories():
+    with pytest.raises(UserInputError, match='written more than once'):
+        parse_cli_args(('main', '-repos', 'owner/repo', 'owner/repo', '-file_mode', 'split_auto'))
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from pr_info_gatherer import common
+from pr_info_gatherer.common import run_query, UserInputError
+from pr_info_gatherer.const_defines import Defines
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: dict = None, headers: dict = None, text: str = ''):
+        self.status_code = status
+        self.body = body if body is not None else {}
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.text = text
+        self.reason = 'reason'
+
+    def json(self) -> dict:
+        return self.body
+
+
+class FakeSession:
+    """ Session that answers posts with given responses, in order """
+
+    def __init__(self, *responses: FakeResponse):
+        self.responses = list(responses)
+        self.posts = 0
+
+    def post(self, endpoint, json, headers) -> FakeResponse:
+        self.posts += 1
+        return self.responses.pop(0)
+
+
+OK = FakeResponse(200, {'data': {}})
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list:
+    waits = []
+    monkeypatch.setattr(common.time, 'sleep', waits.append)
+    return waits
+
+
+def query(session: FakeSession) -> dict:
+    return run_query('query', None, {}, 'endpoint', session)
+
+
+def test_retry_after_is_respected(sleeps):
+    session = FakeSession(FakeResponse(403, headers={'Retry-After': '7'}), OK)
+
+    assert query(session) == {'data': {}}
+    assert sleeps == [7.0]
+
+
+def test_secondary_rate_limit_without_retry_after_backs_off(sleeps):
+    limited = FakeResponse(403, text='You have exceeded a secondary rate limit')
+    session = FakeSession(limited, limited, OK)
+
+    assert query(session) == {'data': {}}
+    assert sleeps == [Defines.API_RATE_LIMIT_BACKOFF_S, Defines.API_RATE_LIMIT_BACKOFF_S * 2]
+
+
+def test_exhausted_rate_limit_waits_for_reset(sleeps):
+    reset = str(int(time.time()) + 30)
+    session = FakeSession(FakeResponse(200, {'errors': [{'type': 'RATE_LIMITED'}]},
+                                       {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}), OK)
+
+    assert query(session) == {'data': {}}
+    assert 25 <= sleeps[0] <= Defines.API_RATE_LIMIT_MAX_WAIT_S
+
+
+def test_retries_are_bounded(sleeps):
+    session = FakeSession(*[FakeResponse(429)] * (Defines.API_RATE_LIMIT_RETRIES + 1))
+
+    with pytest.raises(RuntimeError, match='"429"'):
+        query(session)
+    assert session.posts == Defines.API_RATE_LIMIT_RETRIES + 1
+    assert len(sleeps) == Defines.API_RATE_LIMIT_RETRIES
+
+
+def test_too_long_wait_is_not_retried(sleeps):
+    session = FakeSession(FakeResponse(403, headers={'Retry-After': str(Defines.API_RATE_LIMIT_MAX_WAIT_S + 1)}))
+
+    with pytest.raises(RuntimeError, match='"403"'):
+        query(session)
+    assert sleeps == []
+
+
+@pytest.mark.parametrize('response, error', [
+    (FakeResponse(403, text='Resource not accessible'), RuntimeError),
+    (FakeResponse(401), UserInputError),
+    (FakeResponse(200, {'errors': [{'type': 'NOT_FOUND'}]}), RuntimeError)
+])
+def test_other_errors_are_not_retried(sleeps, response, error):
+    session = FakeSession(response)
+
+    with pytest.raises(error):
+        query(session)
+    assert session.posts == 1
+    assert sleeps == []
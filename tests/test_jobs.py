@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from pr_info_gatherer.cli_args import RepoCLArg, ApiTokenCLArg, NumberOfRequestsCLArg, FileModeCLArg, TrendCLArg, \
+    FileMode
+from pr_info_gatherer.common import UserInputError
+from pr_info_gatherer.const_defines import Defines
+from pr_info_gatherer.jobs import load_job_file
+
+TOKEN = 'a' * Defines.TOKEN_LENGTH
+
+
+def write_job_file(directory, content) -> str:
+    jobsPath = os.path.join(directory, 'jobs.json')
+    with open(jobsPath, 'w', encoding='utf-8') as jobsFile:
+        json.dump(content, jobsFile)
+    return jobsPath
+
+
+def test_defaults_are_shared_and_overridden_by_jobs(tmp_path):
+    jobsPath = write_job_file(tmp_path, {
+        'pr_n': 20,
+        'jobs': [
+            {'repos': ['owner/repo1'], 'file_mode': ['single', 'first']},
+            {'repos': ['owner/repo2'], 'file_mode': ['single', 'second'], 'pr_n': 5}
+        ]
+    })
+
+    first, second = load_job_file(jobsPath)
+
+    assert first[RepoCLArg.CLI_TEXT] == ['owner/repo1']
+    assert first[NumberOfRequestsCLArg.CLI_TEXT] == 20
+    assert second[NumberOfRequestsCLArg.CLI_TEXT] == 5
+    assert second[ApiTokenCLArg.CLI_TEXT] == Defines.DEFAULT_TOKEN
+
+
+def test_relative_paths_resolve_against_job_file(tmp_path):
+    (tmp_path / 'token_file').write_text(TOKEN, encoding='utf-8')
+    jobsPath = write_job_file(tmp_path, {
+        'api_token': 'token_file',
+        'jobs': [{'repos': ['owner/repo'], 'file_mode': ['single', 'out'], 'trend': ['csv', 'week', 4, 'trend']}]
+    })
+
+    job, = load_job_file(jobsPath)
+
+    assert job[ApiTokenCLArg.CLI_TEXT] == TOKEN
+    assert job[FileModeCLArg.CLI_TEXT] == [FileMode.single, os.path.join(str(tmp_path), 'out')]
+    assert job[TrendCLArg.CLI_TEXT][3] == os.path.join(str(tmp_path), 'trend')
+
+
+@pytest.mark.parametrize('job, message', [
+    ({'repos': ['owner/repo'], 'pr_n': ''}, 'Empty value'),
+    ({'repos': ['owner/repo'], 'pr_n': []}, 'Empty value'),
+    ({'repos': ['owner/repo', '-pr_n'], 'pr_n': 1}, 'cannot start with "-"'),
+    ({'repos': ['owner/repo'], 'pr_n': True}, 'expected string or integer'),
+    ({'repos': ['owner/repo'], 'serve': [8080]}, 'Unknown job key'),
+    ({'repos': ['owner/repo'], 'unknown': 1}, 'Unknown job key'),
+    ({'pr_n': 1}, 'has no repository paths')
+])
+def test_invalid_jobs_are_rejected(tmp_path, job, message):
+    jobsPath = write_job_file(tmp_path, {'jobs': [job]})
+
+    with pytest.raises(UserInputError, match=message):
+        load_job_file(jobsPath)
+
+
+def test_jobs_writing_the_same_file_are_rejected(tmp_path):
+    jobsPath = write_job_file(tmp_path, {
+        'jobs': [
+            {'repos': ['owner/repo1'], 'file_mode': ['single', 'report']},
+            {'repos': ['owner/repo2'], 'file_mode': ['single_sheets', 'report.xlsx']}
+        ]
+    })
+
+    with pytest.raises(UserInputError, match='Jobs #0 and #1'):
+        load_job_file(jobsPath)
+
+
+def test_job_file_without_jobs_list_is_rejected(tmp_path):
+    jobsPath = write_job_file(tmp_path, {'repos': ['owner/repo']})
+
+    with pytest.raises(UserInputError, match='has no "jobs" list'):
+        load_job_file(jobsPath)
+
+
+def test_job_writing_the_same_file_twice_is_rejected(tmp_path):
+    jobsPath = write_job_file(tmp_path, {
+        'jobs': [{'repos': ['owner/repo'], 'file_mode': ['single', 'same'], 'trend': ['sheet', 'week', 2, 'same']}]
+    })
+
+    with pytest.raises(UserInputError, match='Job #0 .*Trend would overwrite'):
+        load_job_file(jobsPath)
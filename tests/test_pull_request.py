@@ -0,0 +1,73 @@
+import json
+import re
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from pr_info_gatherer import pull_request
+from pr_info_gatherer.cli_args import ApiEndpointCLArg
+from pr_info_gatherer.const_defines import Defines
+from pr_info_gatherer.pull_request import split_date_windows, fetch_window_edges, merge_edges
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+UNTIL = datetime(2024, 3, 31, 12, 30, tzinfo=timezone.utc)
+
+
+def make_edge(number: int, createdAt: datetime) -> dict:
+    return {'node': {'number': number, 'createdAt': createdAt.strftime(Defines.SEARCH_DATE_FORMAT)}}
+
+
+@pytest.mark.parametrize('windowCount', [1, 2, 3, 7])
+def test_windows_cover_range_newest_first(windowCount):
+    windows = split_date_windows(SINCE, UNTIL, windowCount)
+
+    assert len(windows) == windowCount
+    assert windows[0][1] == UNTIL
+    assert windows[-1][0] == SINCE
+    for start, end in windows:
+        assert start < end
+
+
+def test_windows_do_not_overlap():
+    windows = split_date_windows(SINCE, UNTIL, 5)
+
+    for newer, older in zip(windows, windows[1:]):
+        assert older[1] == newer[0] - timedelta(seconds=1)
+
+
+def test_merge_edges_replaces_by_number_and_sorts_newest_first():
+    old = [make_edge(1, SINCE), make_edge(2, SINCE + timedelta(days=1))]
+    new = [make_edge(2, SINCE + timedelta(days=1)), make_edge(3, SINCE + timedelta(days=2))]
+    new[0]['node']['title'] = 'updated'
+
+    merged = merge_edges(old, new)
+
+    assert [edge['node']['number'] for edge in merged] == [3, 2, 1]
+    assert merged[1]['node'].get('title') == 'updated'
+
+
+def test_window_over_results_limit_is_split(monkeypatch):
+    """ Fake search returns issueCount of the whole window and a single page of its pull requests """
+    limit = 10
+    prs = [make_edge(number, SINCE + timedelta(hours=number)) for number in range(25)]
+    queries = []
+
+    def fake_run_query(query, variables, headers, endpoint, session=None):
+        searchQuery = json.loads(variables)['searchQuery']
+        queries.append(searchQuery)
+        start, end = re.search(r'created:(\S+)\.\.(\S+)', searchQuery).groups()
+        inWindow = [edge for edge in prs if start <= edge['node']['createdAt'] <= end]
+        return {'data': {'search': {
+            'issueCount': len(inWindow),
+            'edges': inWindow[0:limit],
+            'pageInfo': {'hasNextPage': False, 'endCursor': None}
+        }}}
+
+    monkeypatch.setattr(pull_request, 'run_query', fake_run_query)
+    monkeypatch.setattr(Defines, 'SEARCH_RESULTS_LIMIT', limit)
+
+    edges = fetch_window_edges('owner/repo', (SINCE, SINCE + timedelta(days=2)),
+                               {ApiEndpointCLArg.CLI_TEXT: 'endpoint'}, {}, None)
+
+    assert sorted(edge['node']['number'] for edge in edges) == list(range(25))
+    assert len(queries) > 1
@@ -0,0 +1,188 @@
+import re
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from conftest import format_date
+from pr_info_gatherer import pull_request
+from pr_info_gatherer.cli_args import ApiTokenCLArg
+from pr_info_gatherer.cli_parser import parse_cli_args
+from pr_info_gatherer.const_defines import Defines
+from pr_info_gatherer.pull_request import PullRequestFetcher
+
+REPO = 'owner/repo'
+TOKEN = 'a' * Defines.TOKEN_LENGTH
+OTHER_TOKEN = 'b' * Defines.TOKEN_LENGTH
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def make_input(prCount: int, token: str = TOKEN) -> dict:
+    return parse_cli_args(('main', '-repos', REPO, '-pr_n', str(prCount), '-api_token', token,
+                           '-api_endpoint', 'fake'))
+
+
+def headers_of(inputDict: dict) -> dict:
+    return {'Authorization': f'token {inputDict[ApiTokenCLArg.CLI_TEXT]}'}
+
+
+def fetch_numbers(fetcher: PullRequestFetcher, inputDict: dict, since=None) -> list:
+    queryJson = fetcher.fetch(REPO, inputDict, headers_of(inputDict), since)
+    return [edge['node']['number'] for edge in
+            queryJson['data']['repositoryOwner']['repository']['pullRequests']['edges']]
+
+
+def add_daily_pull_requests(fake_github, count: int) -> None:
+    """ Pull request number i was created i days ago """
+    fake_github.add_pull_requests(REPO, [NOW - timedelta(days=i) for i in range(count)])
+
+
+def test_reserved_jobs_fetch_repository_once(fake_github):
+    add_daily_pull_requests(fake_github, 50)
+    jobs = [make_input(5), make_input(20)]
+    fetcher = PullRequestFetcher()
+    for job in jobs:
+        fetcher.reserve(REPO, job)
+
+    assert fetch_numbers(fetcher, jobs[0]) == list(range(5))
+    assert fetch_numbers(fetcher, jobs[1]) == list(range(20))
+    assert len(fake_github.requests) == 1
+    assert fake_github.requests[0]['pr_n'] == 20
+
+
+def test_bigger_count_than_cached_is_fetched_again(fake_github):
+    add_daily_pull_requests(fake_github, 50)
+    fetcher = PullRequestFetcher()
+
+    assert len(fetch_numbers(fetcher, make_input(5))) == 5
+    assert len(fetch_numbers(fetcher, make_input(20))) == 20
+    assert len(fetch_numbers(fetcher, make_input(10))) == 10
+    assert [request['pr_n'] for request in fake_github.requests] == [5, 20]
+
+
+def test_whole_repository_covers_any_count(fake_github):
+    add_daily_pull_requests(fake_github, 3)
+    fetcher = PullRequestFetcher()
+
+    assert fetch_numbers(fetcher, make_input(10)) == [0, 1, 2]
+    assert fetch_numbers(fetcher, make_input(100)) == [0, 1, 2]
+    assert len(fake_github.requests) == 1
+
+
+def test_tokens_do_not_share_cache(fake_github):
+    add_daily_pull_requests(fake_github, 10)
+    fetcher = PullRequestFetcher()
+    jobs = [make_input(5), make_input(5, OTHER_TOKEN)]
+    for job in jobs:
+        fetcher.reserve(REPO, job)
+
+    for job in jobs:
+        assert len(fetch_numbers(fetcher, job)) == 5
+    assert [request['token'] for request in fake_github.requests] == [f'token {TOKEN}', f'token {OTHER_TOKEN}']
+
+
+def test_concurrent_fetches_wait_for_single_request(fake_github):
+    add_daily_pull_requests(fake_github, 10)
+    fake_github.delay = 0.2
+    fetcher = PullRequestFetcher()
+    results = []
+
+    def fetch():
+        results.append(fetch_numbers(fetcher, make_input(10)))
+
+    threads = [threading.Thread(target=fetch) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    assert len(fake_github.requests) == 1
+    assert results == [list(range(10))] * 5
+
+
+####################################
+### Coverage of since dates and incremental refresh
+####################################
+
+
+class Clock(datetime):
+    """ datetime of pull_request module, with now() that is set by the test """
+    current = NOW
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(pull_request, 'datetime', Clock)
+    monkeypatch.setattr(Clock, 'current', NOW)
+    return Clock
+
+
+def search_ranges(fake_github) -> list:
+    """ (created range, updated:>= date or None) of every recorded search query """
+    ranges = []
+    for request in fake_github.requests:
+        if 'searchQuery' in request:
+            created = re.search(r'created:(\S+)', request['searchQuery']).group(1)
+            updated = re.search(r'updated:>=(\S+)', request['searchQuery'])
+            ranges.append((created, updated and updated.group(1)))
+    return ranges
+
+
+def test_older_since_fetches_only_missing_range(fake_github, clock):
+    add_daily_pull_requests(fake_github, 50)
+    fetcher = PullRequestFetcher()
+
+    assert fetch_numbers(fetcher, make_input(10)) == list(range(10))
+    assert fetch_numbers(fetcher, make_input(10), NOW - timedelta(days=20)) == list(range(21))
+    assert fetch_numbers(fetcher, make_input(10), NOW - timedelta(days=15)) == list(range(16))
+
+    assert len(fake_github.requests) == 2
+    assert search_ranges(fake_github) == [
+        (f'{format_date(NOW - timedelta(days=20))}..{format_date(NOW - timedelta(days=9))}', None)]
+
+
+def test_refresh_merges_updated_pull_requests(fake_github, clock):
+    add_daily_pull_requests(fake_github, 50)
+    fetcher = PullRequestFetcher()
+    fetch_numbers(fetcher, make_input(10))
+
+    updated = fake_github.prs[REPO][3]
+    updated['title'] = 'updated'
+    updated['updatedAt'] = format_date(NOW + timedelta(hours=1))
+    new, = fake_github.add_pull_requests(REPO, [NOW + timedelta(minutes=30)])
+    clock.current = NOW + timedelta(hours=2)
+    fetcher.refresh()
+
+    queryJson = fetcher.fetch(REPO, make_input(10), headers_of(make_input(10)))
+    nodes = [edge['node'] for edge in queryJson['data']['repositoryOwner']['repository']['pullRequests']['edges']]
+    assert [node['number'] for node in nodes] == [new['number']] + list(range(9))
+    assert nodes[4]['title'] == 'updated'
+    assert len(fake_github.requests) == 2
+
+    clock.current = NOW + timedelta(hours=3)
+    fetcher.refresh()
+    assert [updatedSince for _, updatedSince in search_ranges(fake_github)] == \
+        [format_date(NOW), format_date(NOW + timedelta(hours=2))]
+
+
+def test_failed_refresh_keeps_cached_pull_requests(fake_github, clock):
+    add_daily_pull_requests(fake_github, 50)
+    fetcher = PullRequestFetcher()
+    fetch_numbers(fetcher, make_input(10))
+
+    fake_github.error = RuntimeError('rate limited')
+    clock.current = NOW + timedelta(hours=2)
+    fetcher.refresh()
+    fake_github.error = None
+
+    assert fetch_numbers(fetcher, make_input(10)) == list(range(10))
+    clock.current = NOW + timedelta(hours=3)
+    fetcher.refresh()
+    assert len(fake_github.requests) == 3
+    assert [updatedSince for _, updatedSince in search_ranges(fake_github)] == [format_date(NOW)] * 2
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone, timedelta
+from urllib.parse import parse_qs
+
+import pytest
+
+from pr_info_gatherer.common import UserInputError
+from pr_info_gatherer.server import PRReportRequestHandler
+
+
+def parse(queryString: str, defaultCount: int = 10):
+    return PRReportRequestHandler.parse_report_query(parse_qs(queryString), defaultCount)
+
+
+def test_repos_are_split_and_count_defaults():
+    repos, since, prCount = parse('repos=owner/repo1,owner/repo2&repos=owner/repo3')
+
+    assert repos == ['owner/repo1', 'owner/repo2', 'owner/repo3']
+    assert since is None
+    assert prCount == 10
+
+
+def test_since_without_timezone_is_utc():
+    _, since, prCount = parse('repos=owner/repo&since=2024-01-01&pr_n=5')
+
+    assert since == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert prCount == 5
+
+
+def test_since_keeps_given_timezone():
+    _, since, _ = parse('repos=owner/repo&since=2024-01-01T10:00:00%2B02:00')
+
+    assert since.utcoffset() == timedelta(hours=2)
+    assert since == datetime(2024, 1, 1, 8, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('queryString, message', [
+    ('', 'No repository paths'),
+    ('repos=,', 'No repository paths'),
+    ('repos=owner', 'Invalid repository paths'),
+    ('repos=owner/repo/extra', 'Invalid repository paths'),
+    ('repos=owner/repo&since=yesterday', 'Invalid since date'),
+    ('repos=owner/repo&pr_n=ten', 'Invalid pull requests count'),
+    ('repos=owner/repo&pr_n=0', 'Invalid pull requests count')
+])
+def test_invalid_queries_are_rejected(queryString, message):
+    with pytest.raises(UserInputError, match=message):
+        parse(queryString)
@@ -0,0 +1,131 @@
+import os
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from conftest import make_pull_request
+from pr_info_gatherer.cli_args import FileMode, TrendBucket
+from pr_info_gatherer.const_defines import Defines
+from pr_info_gatherer.output_formats import to_excel
+from pr_info_gatherer.output_formats.to_excel import PRExcelManager, PRExcelWriter, write_trend_excel
+from pr_info_gatherer.pull_request import PullRequest
+
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def merged_pull_request(title: str) -> PullRequest:
+    return make_pull_request(CREATED_AT, daysToMerge=2, title=title)
+
+
+def row_by_column(pr: PullRequest) -> dict:
+    row = PRExcelWriter.pull_request_to_row(pr)
+    assert len(row) == len(PRExcelWriter.Columns)
+    return {col.name: row[col.value] for col in PRExcelWriter.Columns}
+
+
+def test_row_of_approved_and_merged_pull_request():
+    pr = make_pull_request(CREATED_AT, daysToApprove=1.5, daysToMerge=3, title='title', author='author')
+
+    assert row_by_column(pr) == {
+        'author': 'author',
+        'created_at': CREATED_AT,
+        'state': f'{Defines.PR_MERGED_STATE},{Defines.PR_APPROVED_STATE}',
+        'days_until_first_approved': 1,
+        'days_until_merged': 3,
+        'days_from_approve_to_merge': 1,
+        'first_approved_review_created_at': CREATED_AT + timedelta(days=1.5),
+        'first_approved_by': 'reviewer',
+        'merged_at': CREATED_AT + timedelta(days=3),
+        'merged_by': 'merger',
+        'is_closed': True,
+        'title': 'title'
+    }
+
+
+def test_row_of_pull_request_without_review_and_merge_has_empty_cells():
+    row = row_by_column(make_pull_request(CREATED_AT, title='title', author='author'))
+
+    assert row == {
+        'author': 'author',
+        'created_at': CREATED_AT,
+        'state': 'OPEN',
+        'days_until_first_approved': Defines.XLSX_EMPTY_CELL,
+        'days_until_merged': Defines.XLSX_EMPTY_CELL,
+        'days_from_approve_to_merge': Defines.XLSX_EMPTY_CELL,
+        'first_approved_review_created_at': Defines.XLSX_EMPTY_CELL,
+        'first_approved_by': Defines.XLSX_EMPTY_CELL,
+        'merged_at': Defines.XLSX_EMPTY_CELL,
+        'merged_by': Defines.XLSX_EMPTY_CELL,
+        'is_closed': False,
+        'title': 'title'
+    }
+
+
+def test_rows_fingerprint_is_stable_and_detects_changes():
+    rows = [('author', CREATED_AT, 'MERGED', 'N/A', 2, 'title')]
+
+    assert PRExcelManager.rows_fingerprint(rows) == PRExcelManager.rows_fingerprint(list(rows))
+    assert PRExcelManager.rows_fingerprint(rows) != \
+        PRExcelManager.rows_fingerprint([('author', CREATED_AT + timedelta(seconds=1), 'MERGED', 'N/A', 2, 'title')])
+    assert PRExcelManager.rows_fingerprint(rows) != PRExcelManager.rows_fingerprint(rows + rows)
+
+
+def test_split_auto_skips_unchanged_repositories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    filename = PRExcelManager.repo_path_to_filename('owner/repo')
+
+    with PRExcelManager(FileMode.split_auto) as excelFile:
+        assert excelFile.add_repo_pull_requests('owner/repo', [merged_pull_request('first')])
+    assert os.path.exists(filename)
+    assert os.path.exists(Defines.XLSX_FINGERPRINTS_FILE)
+
+    with PRExcelManager(FileMode.split_auto) as excelFile:
+        assert not excelFile.add_repo_pull_requests('owner/repo', [merged_pull_request('first')])
+        assert excelFile.add_repo_pull_requests('owner/repo', [merged_pull_request('changed')])
+
+    os.remove(filename)
+    with PRExcelManager(FileMode.split_auto) as excelFile:
+        assert excelFile.add_repo_pull_requests('owner/repo', [merged_pull_request('changed')])
+    assert sorted(os.listdir(tmp_path)) == sorted([filename, Defines.XLSX_FINGERPRINTS_FILE])
+
+
+def test_failed_trend_write_keeps_previous_file(tmp_path, monkeypatch):
+    trendPath = tmp_path / 'trend.xlsx'
+    trendPath.write_bytes(b'previous')
+
+    def failing_write(filename, rows, bucket, rollingWindow):
+        with open(filename, 'wb') as partialFile:
+            partialFile.write(b'partial')
+        raise RuntimeError('write failed')
+
+    monkeypatch.setattr(to_excel, '_write_trend_workbook', failing_write)
+    with pytest.raises(RuntimeError):
+        write_trend_excel(str(tmp_path / 'trend'), [], TrendBucket.week, 4)
+
+    assert trendPath.read_bytes() == b'previous'
+    assert os.listdir(tmp_path) == ['trend.xlsx']
+
+
+@pytest.mark.parametrize('fileMode', [FileMode.single, FileMode.single_sheets])
+def test_failed_report_keeps_previous_file(tmp_path, fileMode):
+    reportPath = tmp_path / 'report.xlsx'
+    reportPath.write_bytes(b'previous')
+
+    with pytest.raises(RuntimeError):
+        with PRExcelManager(fileMode, str(tmp_path / 'report')) as excelFile:
+            excelFile.add_repo_pull_requests('owner/good', [merged_pull_request('first')])
+            raise RuntimeError('fetch of owner/bad failed')
+
+    assert reportPath.read_bytes() == b'previous'
+    assert os.listdir(tmp_path) == ['report.xlsx']
+
+
+def test_failed_split_auto_report_keeps_completed_repositories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with PRExcelManager(FileMode.split_auto) as excelFile:
+            excelFile.add_repo_pull_requests('owner/good', [merged_pull_request('first')])
+            raise RuntimeError('fetch of owner/bad failed')
+
+    assert os.listdir(tmp_path) == [PRExcelManager.repo_path_to_filename('owner/good')]
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone, timedelta, date
+
+from conftest import make_pull_request
+from pr_info_gatherer.cli_args import TrendBucket
+from pr_info_gatherer.trends import compute_trend, bucket_label, TrendRow
+
+
+def column(rows, name: str) -> list:
+    index = TrendRow.COLUMNS.index(name)
+    return [row.values()[index] for row in rows]
+
+
+def test_empty_input_has_no_buckets():
+    assert compute_trend([], TrendBucket.week, 4) == []
+
+
+def test_iso_week_labels():
+    assert bucket_label(date(2024, 12, 30), TrendBucket.week) == '2025-W01'
+    assert bucket_label(date(2021, 1, 4), TrendBucket.week) == '2021-W01'
+    assert bucket_label(date(2020, 12, 28), TrendBucket.week) == '2020-W53'
+    assert bucket_label(date(2024, 2, 1), TrendBucket.month) == '2024-02'
+
+
+def test_empty_buckets_are_filled():
+    prs = [
+        make_pull_request(datetime(2024, 1, 3, tzinfo=timezone.utc), daysToApprove=1),
+        make_pull_request(datetime(2024, 1, 25, tzinfo=timezone.utc), daysToMerge=2)
+    ]
+
+    rows = compute_trend(prs, TrendBucket.week, 2)
+
+    assert column(rows, 'bucket') == ['2024-W01', '2024-W02', '2024-W03', '2024-W04']
+    assert column(rows, 'pr_count') == [1, 0, 0, 1]
+    assert column(rows, 'median_days_to_approve') == [1.0, None, None, None]
+
+
+def test_month_buckets_are_filled_across_years():
+    prs = [
+        make_pull_request(datetime(2023, 11, 30, tzinfo=timezone.utc)),
+        make_pull_request(datetime(2024, 2, 1, tzinfo=timezone.utc))
+    ]
+
+    rows = compute_trend(prs, TrendBucket.month, 1)
+
+    assert column(rows, 'bucket') == ['2023-11', '2023-12', '2024-01', '2024-02']
+
+
+def test_rolling_median_pools_samples_of_the_window():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    prs = [
+        make_pull_request(start, daysToApprove=1, daysToMerge=10),
+        make_pull_request(start + timedelta(weeks=1), daysToApprove=2),
+        make_pull_request(start + timedelta(weeks=1), daysToApprove=4),
+        make_pull_request(start + timedelta(weeks=3), daysToApprove=8)
+    ]
+
+    rows = compute_trend(prs, TrendBucket.week, 2)
+
+    assert column(rows, 'median_days_to_approve') == [1.0, 3.0, None, 8.0]
+    assert column(rows, 'rolling_median_days_to_approve') == [1.0, 2.0, 3.0, 8.0]
+    assert column(rows, 'rolling_median_days_to_merge') == [10.0, 10.0, None, None]
+    assert column(rows, 'approved_count') == [1, 2, 0, 1]
+    assert column(rows, 'merged_count') == [1, 0, 0, 0]